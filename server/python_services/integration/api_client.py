@@ -5,6 +5,7 @@ This module provides a client for communicating with Python services
 
 import asyncio
 import aiohttp
+import orjson
 import json
 import logging
 from typing import Dict, Any, Optional, List
@@ -40,7 +41,7 @@ class PythonServiceClient:
         try:
             async with self.session.get(f"{self.base_url}/health") as response:
                 if response.status == 200:
-                    return await response.json()
+                    return orjson.loads(await response.read())
                 else:
                     return {"status": "unhealthy", "error": f"HTTP {response.status}"}
         except Exception as e:
@@ -55,7 +56,7 @@ class PythonServiceClient:
             try:
                 if method.upper() == "GET":
                     async with self.session.get(url) as response:
-                        result = await response.json()
+                        result = orjson.loads(await response.read())
                         if response.status == 200:
                             return result
                         else:
@@ -63,7 +64,7 @@ class PythonServiceClient:
                 
                 elif method.upper() == "POST":
                     async with self.session.post(url, json=data) as response:
-                        result = await response.json()
+                        result = orjson.loads(await response.read())
                         if response.status == 200:
                             return result
                         else:
@@ -9,6 +9,7 @@ import logging
 from typing import Dict, Any, Optional
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 import uvicorn
 from datetime import datetime
@@ -29,7 +30,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Zipzy Python Services API",
     description="AI/ML Services for Zipzy Delivery Application",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
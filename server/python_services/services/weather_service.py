@@ -1,20 +1,180 @@
 import requests
+import aiohttp
+import yarl
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Set, Tuple
+from collections import defaultdict
+from cachetools import TTLCache
+import redis.asyncio as aioredis
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
 import logging
 import json
 import asyncio
+import os
+import time
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Serialization options for cached payloads; NumPy scalars from the analyzers serialize directly
+_ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+
+def _orjson_dumps_str(obj: Any) -> str:
+    """orjson encoder for aiohttp, which expects json_serialize to return str"""
+    return orjson.dumps(obj).decode()
+
+# Errors meaning Redis is unreachable rather than rejecting one command
+_REDIS_UNAVAILABLE_ERRORS = (RedisConnectionError, RedisTimeoutError, OSError, asyncio.TimeoutError)
+
+# Parsed once so outbound requests only attach their query string
+_ONECALL_URL = yarl.URL("https://api.openweathermap.org/data/2.5/onecall")
+
+# Upper bounds of the minimal/low/medium/high risk bands; anything above is critical
+_RISK_THRESHOLDS = np.array([0.2, 0.4, 0.6, 0.8])
+_RISK_LABELS = np.array(["minimal", "low", "medium", "high", "critical"])
+
+# "HH:00" labels for the 24 hourly forecast slots
+_HOURLY_TIMES = [f"{hour:02d}:00" for hour in range(24)]
+
+# Mock payloads served until the live weather API is configured; callers get copies
+_CURRENT_WEATHER_TEMPLATE: Dict[str, Any] = {
+    "temperature": 25.0,
+    "feels_like": 27.0,
+    "humidity": 65,
+    "wind_speed": 12.0,
+    "wind_direction": 180,
+    "description": "Partly cloudy",
+    "icon": "02d",
+    "visibility": 10000,
+    "pressure": 1013,
+    "sunrise": "06:30",
+    "sunset": "18:45"
+}
+
+_HOURLY_FORECAST_TEMPLATE: List[Dict[str, Any]] = [
+    {
+        "hour": hour,
+        "time": _HOURLY_TIMES[hour],
+        "temperature": float(temperature),
+        "description": "Clear",
+        "icon": "01d" if 6 <= hour <= 18 else "01n",
+        "humidity": 65,
+        "wind_speed": 10,
+        "precipitation_probability": 10
+    }
+    for hour, temperature in zip(range(24), 22.0 + (np.arange(24) - 12) * 0.5)
+]
+
+@lru_cache(maxsize=1)
+def _mock_5day_forecast(today: date) -> Tuple[Dict[str, Any], ...]:
+    """Build the mock 5-day forecast once per calendar day"""
+    forecast = []
+    for i in range(5):
+        day = today + timedelta(days=i)
+        forecast.append({
+            "date": day.strftime("%Y-%m-%d"),
+            "day": day.strftime("%A"),
+            "temperature": {
+                "min": 20 + i,
+                "max": 28 + i
+            },
+            "description": "Partly cloudy",
+            "icon": "02d",
+            "humidity": 60 + i,
+            "wind_speed": 10 + i,
+            "precipitation_probability": 20 + i
+        })
+    return tuple(forecast)
+
+# Thresholds per analysis column above which a day counts as "high";
+# temperature has no high-day count so its threshold never trips
+_HIGH_DAY_THRESHOLDS = np.array([np.inf, 50, 20], dtype=np.float64)
+# Decimal places kept in the reported per-day slopes
+_SLOPE_DECIMALS = 2
+
+def _analyze_weather_patterns_sync(forecast: List[Dict], hourly_forecast: List[Dict]) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """Compute temperature, precipitation and wind analyses for a daily forecast"""
+    # Columns: max temperature, precipitation probability, wind speed
+    stacked = np.array(
+        [(day["temperature"]["max"], day["precipitation_probability"], day["wind_speed"]) for day in forecast],
+        dtype=np.float64
+    )
+    means = stacked.mean(axis=0)
+    deltas = stacked[-1] - stacked[0]
+    high_counts = (stacked > _HIGH_DAY_THRESHOLDS).sum(axis=0)
+    # Least-squares change per day for every column in one fit
+    if len(stacked) > 1:
+        slopes = np.polyfit(np.arange(len(stacked)), stacked, 1)[0]
+    else:
+        slopes = np.zeros(stacked.shape[1])
+    # Least-squares fits carry float noise (e.g. 0.9999999999999991), so report them rounded
+    slopes = np.round(slopes, _SLOPE_DECIMALS)
+    temperatures = [day["temperature"]["max"] for day in forecast]
+    
+    # Analyze temperature patterns
+    temp_analysis = {
+        "avg_temperature": float(means[0]),
+        "temperature_range": max(temperatures) - min(temperatures),
+        "temperature_trend": "stable" if abs(deltas[0]) < 5 else "changing",
+        "temperature_slope": float(slopes[0])
+    }
+    
+    # Analyze precipitation patterns
+    precip_analysis = {
+        "avg_precipitation_probability": float(means[1]),
+        "high_precipitation_days": int(high_counts[1]),
+        "precipitation_trend": "increasing" if deltas[1] > 0 else "decreasing",
+        "precipitation_slope": float(slopes[1])
+    }
+    
+    # Analyze wind patterns
+    wind_analysis = {
+        "avg_wind_speed": float(means[2]),
+        "high_wind_days": int(high_counts[2]),
+        "wind_trend": "increasing" if deltas[2] > 0 else "decreasing",
+        "wind_slope": float(slopes[2])
+    }
+    
+    return temp_analysis, precip_analysis, wind_analysis
+
 class WeatherService:
+    # Risk factors and their weights in the overall weather risk score
+    _RISK_KEYS = ("precipitation_risk", "wind_risk", "temperature_risk", "visibility_risk", "road_condition_risk")
+    _RISK_WEIGHTS = np.array([0.25, 0.20, 0.15, 0.20, 0.20], dtype=np.float64)
+    
     def __init__(self):
-        self.api_key = None  # Would be set from environment variables
-        self.base_url = "https://api.openweathermap.org/data/2.5"
-        self.cache = {}
-        self.cache_ttl = 1800  # 30 minutes
+        self.api_key = os.getenv("OPENWEATHER_API_KEY")  # Mock data is served when unset
+        self.base_url = str(_ONECALL_URL.parent)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.cache_ttl = 1800  # 30 minutes; entries older than this are refreshed in the background
+        self.cache_hard_ttl = 3600  # 1 hour; entries older than this are never served
+        # In-process L1 of (forecast dict, fetched timestamp, upstream ETag) in front of the shared Redis L2 cache of JSON
+        self.cache = TTLCache(maxsize=10000, ttl=self.cache_hard_ttl)
+        # Short socket timeouts so a slow or missing Redis costs a cache miss, not a stalled request
+        self.redis = aioredis.Redis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379"),
+            socket_connect_timeout=0.25,
+            socket_timeout=0.25
+        )
+        # After a connection failure Redis is skipped until this monotonic time
+        self._redis_down_until = 0.0
+        self.redis_retry_after = 30  # seconds
+        # Bump the version to invalidate every cached forecast after a schema change
+        self.cache_key_prefix = "weather:v1:forecast"
+        # Per-key locks so concurrent misses share a single upstream fetch
+        self._locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # Pending load tasks that concurrent callers for the same key await
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Strong references to background refreshes so they are not garbage collected
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        # Decimal places kept for lat/lon (~11 m) so GPS jitter shares one cache entry
+        self.cache_key_precision = 4
+        # Caps concurrent upstream weather API calls; the semaphore itself is created on first use
+        self.max_concurrency = int(os.getenv("WEATHER_MAX_CONC", "8"))
+        self._sema: Optional[asyncio.Semaphore] = None
         
     async def get_weather_forecast(self, location: Dict[str, Any]) -> Dict[str, Any]:
         """Get weather forecast for delivery planning"""
@@ -26,13 +186,128 @@ class WeatherService:
             if not lat or not lon:
                 raise ValueError("Latitude and longitude required")
             
-            # Check cache first
-            cache_key = f"forecast_{lat}_{lon}"
-            if cache_key in self.cache:
-                cached_data = self.cache[cache_key]
-                if datetime.now().timestamp() - cached_data["timestamp"] < self.cache_ttl:
-                    return cached_data["data"]
+            lat = self._round_coordinate(lat)
+            lon = self._round_coordinate(lon)
+            
+            # Check cache first; stale entries are served while a refresh runs
+            cache_key = f"{self.cache_key_prefix}:{lat}:{lon}"
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                forecast, fetched, _ = cached
+                if datetime.now().timestamp() - fetched >= self.cache_ttl:
+                    self._schedule_refresh(cache_key, lat, lon, city)
+                return forecast
+            
+            # Concurrent misses for the same key share one load task. Every caller awaits it
+            # shielded, so a cancelled caller (e.g. a disconnected client) leaves it running for the rest
+            task = self._inflight.get(cache_key)
+            if task is None:
+                task = asyncio.create_task(self._load_forecast(cache_key, lat, lon, city))
+                self._inflight[cache_key] = task
+                task.add_done_callback(lambda t: self._load_done(cache_key, t))
+            return await asyncio.shield(task)
             
+        except Exception as e:
+            logger.error(f"Error in weather forecast: {e}")
+            raise e
+    
+    def _load_done(self, cache_key: str, task: asyncio.Task) -> None:
+        """Forget a finished load, marking its failure retrieved even if no caller was left waiting"""
+        if self._inflight.get(cache_key) is task:
+            del self._inflight[cache_key]
+        if not task.cancelled():
+            task.exception()
+    
+    def _cache_get(self, cache_key: str) -> Optional[Tuple[Dict[str, Any], float, Optional[str]]]:
+        """Return the L1 entry for a key, dropping it once past the hard TTL
+        
+        TTLCache expires entries by insertion time, but one promoted from Redis
+        may already be old, so the hard limit is checked against its fetch time.
+        """
+        cached = self.cache.get(cache_key)
+        if cached is not None and datetime.now().timestamp() - cached[1] >= self.cache_hard_ttl:
+            self.cache.pop(cache_key, None)
+            return None
+        return cached
+    
+    async def _load_forecast(self, cache_key: str, lat: float, lon: float, city: str) -> Dict[str, Any]:
+        """Load a forecast missing from L1, from Redis or upstream"""
+        try:
+            async with self._locks[cache_key]:
+                # A background refresh may have filled the cache while we waited
+                cached = self._cache_get(cache_key)
+                if cached is not None:
+                    return cached[0]
+                
+                # Another worker may already have the forecast in Redis
+                payload, fetched, etag = await self._redis_get_with_fetched(cache_key)
+                if payload is not None:
+                    # Decode once here; L1 hits then return the dict directly
+                    forecast = orjson.loads(payload)
+                    self.cache[cache_key] = (forecast, fetched, etag)
+                    return forecast
+                
+                return await self._refresh(cache_key, lat, lon, city)
+        finally:
+            # Drop the lock on every exit so the map only holds keys being loaded
+            self._locks.pop(cache_key, None)
+    
+    async def _refresh(self, cache_key: str, lat: float, lon: float, city: str) -> Dict[str, Any]:
+        """Fetch a fresh forecast and store it in both cache levels
+        
+        A cached entry with an ETag is revalidated upstream and, if unchanged,
+        kept as-is with its fetch time reset.
+        """
+        cached = self._cache_get(cache_key)
+        forecast_data, etag = await self._fetch_weather_forecast(lat, lon, city, cached[2] if cached else None)
+        if forecast_data is None:
+            forecast_data = cached[0]
+        self.cache[cache_key] = (forecast_data, datetime.now().timestamp(), etag)
+        # Only the shared Redis copy needs serializing
+        await self._redis_set(cache_key, orjson.dumps(forecast_data, option=_ORJSON_OPTIONS), etag)
+        return forecast_data
+    
+    def _schedule_refresh(self, cache_key: str, lat: float, lon: float, city: str) -> None:
+        """Start a background refresh unless one is already running for the key"""
+        if self._locks[cache_key].locked():
+            return
+        task = asyncio.create_task(self._background_refresh(cache_key, lat, lon, city))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+    
+    async def _background_refresh(self, cache_key: str, lat: float, lon: float, city: str) -> None:
+        """Refresh a stale forecast, logging instead of raising on failure"""
+        try:
+            async with self._locks[cache_key]:
+                cached = self.cache.get(cache_key)
+                # A concurrent caller may already have refreshed it
+                if cached is not None and datetime.now().timestamp() - cached[1] < self.cache_ttl:
+                    return
+                await self._refresh(cache_key, lat, lon, city)
+        except Exception as e:
+            logger.error(f"Error refreshing weather forecast {cache_key}: {e}")
+        finally:
+            self._locks.pop(cache_key, None)
+    
+    async def _fetch_weather_forecast(
+        self, lat: float, lon: float, city: str, etag: Optional[str] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Fetch and analyze a fresh weather forecast from upstream
+        
+        Returns the forecast and the upstream ETag, or None in place of the
+        forecast when upstream reports it unchanged since `etag`.
+        """
+        upstream_etag = None
+        if self.api_key:
+            # Current, daily and hourly data come back in a single OneCall response
+            payload, upstream_etag = await self._onecall(lat, lon, etag)
+            if payload is None:
+                return None, upstream_etag
+            offset = payload.get("timezone_offset", 0)
+            current_weather = self._parse_onecall_current(payload.get("current", {}), offset)
+            forecast = [self._parse_onecall_daily(day, offset) for day in payload.get("daily", [])[:5]]
+            hourly_forecast = [self._parse_onecall_hourly(hour, offset) for hour in payload.get("hourly", [])[:24]]
+        else:
             # Get current weather
             current_weather = await self.get_current_weather(lat, lon)
             
@@ -41,38 +316,87 @@ class WeatherService:
             
             # Get hourly forecast for next 24 hours
             hourly_forecast = await self.get_hourly_forecast(lat, lon)
-            
-            # Analyze weather patterns
-            weather_analysis = await self.analyze_weather_patterns(forecast, hourly_forecast)
-            
-            # Generate delivery recommendations
-            delivery_recommendations = await self.generate_delivery_recommendations(weather_analysis)
-            
-            forecast_data = {
-                "location": {
-                    "city": city,
-                    "latitude": lat,
-                    "longitude": lon
-                },
-                "current_weather": current_weather,
-                "forecast": forecast,
-                "hourly_forecast": hourly_forecast,
-                "weather_analysis": weather_analysis,
-                "delivery_recommendations": delivery_recommendations,
-                "updated_at": datetime.now().isoformat()
-            }
-            
-            # Cache the data
-            self.cache[cache_key] = {
-                "data": forecast_data,
-                "timestamp": datetime.now().timestamp()
-            }
-            
-            return forecast_data
-            
+        
+        # Analyze weather patterns
+        weather_analysis = await self.analyze_weather_patterns(forecast, hourly_forecast)
+        
+        # Generate delivery recommendations
+        delivery_recommendations = await self.generate_delivery_recommendations(weather_analysis)
+        
+        forecast_data = {
+            "location": {
+                "city": city,
+                "latitude": lat,
+                "longitude": lon
+            },
+            "current_weather": current_weather,
+            "forecast": forecast,
+            "hourly_forecast": hourly_forecast,
+            "weather_analysis": weather_analysis,
+            "delivery_recommendations": delivery_recommendations,
+            "updated_at": datetime.now().isoformat()
+        }
+        
+        return forecast_data, upstream_etag
+    
+    def _redis_available(self) -> bool:
+        """Whether Redis should be tried, i.e. it has not failed to connect recently"""
+        return time.monotonic() >= self._redis_down_until
+    
+    def _redis_failed(self, action: str, cache_key: str, error: Exception) -> None:
+        """Log a Redis error, skipping Redis for a while if it is unreachable"""
+        if isinstance(error, _REDIS_UNAVAILABLE_ERRORS):
+            # Log once per outage rather than on every cache miss
+            if self._redis_available():
+                logger.warning(f"Redis unavailable, skipping it for {self.redis_retry_after}s: {error}")
+            self._redis_down_until = time.monotonic() + self.redis_retry_after
+        else:
+            logger.warning(f"Redis {action} failed for {cache_key}: {error}")
+    
+    async def _redis_get_with_fetched(self, cache_key: str) -> Tuple[Optional[bytes], float, Optional[str]]:
+        """Read a cached payload from Redis along with when it was fetched and its ETag
+        
+        The fetch time is derived from the key's remaining TTL, so an entry
+        written by another worker keeps its true age in the local cache.
+        """
+        now = datetime.now().timestamp()
+        if not self._redis_available():
+            return None, now, None
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                payload, remaining, etag = await (
+                    pipe.get(cache_key).ttl(cache_key).get(f"{cache_key}:etag").execute()
+                )
         except Exception as e:
-            logger.error(f"Error in weather forecast: {e}")
-            raise e
+            self._redis_failed("read", cache_key, e)
+            return None, now, None
+        etag = etag.decode() if etag else None
+        if payload is None or remaining < 0:
+            return payload, now, etag
+        return payload, now - (self.cache_ttl - remaining), etag
+    
+    async def _redis_set(self, cache_key: str, payload: bytes, etag: Optional[str] = None) -> None:
+        """Write a payload and its ETag to Redis with the cache TTL, ignoring Redis errors"""
+        if not self._redis_available():
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(cache_key, payload, ex=self.cache_ttl)
+                if etag:
+                    pipe.set(f"{cache_key}:etag", etag, ex=self.cache_ttl)
+                else:
+                    pipe.delete(f"{cache_key}:etag")
+                await pipe.execute()
+        except Exception as e:
+            self._redis_failed("write", cache_key, e)
+    
+    async def get_weather_forecasts(self, locations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Get weather forecasts for many locations concurrently
+        
+        Failed lookups are returned in place as exception objects.
+        """
+        tasks = [self.get_weather_forecast(location) for location in locations]
+        return await asyncio.gather(*tasks, return_exceptions=True)
     
     async def analyze_weather_impact(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze weather impact on delivery operations"""
@@ -187,20 +511,20 @@ class WeatherService:
             delivery_zone = data.get("delivery_zone", {})
             time_period = data.get("time_period", "24h")
             
-            # Calculate various risk factors
-            risk_factors = {
-                "precipitation_risk": await self.calculate_precipitation_risk(weather_data),
-                "wind_risk": await self.calculate_wind_risk(weather_data),
-                "temperature_risk": await self.calculate_temperature_risk(weather_data),
-                "visibility_risk": await self.calculate_visibility_risk(weather_data),
-                "road_condition_risk": await self.calculate_road_condition_risk(weather_data)
-            }
+            # Calculate risk factors; a list of weather data yields one row per entry
+            risk_matrix = self._risk_vector(weather_data)
             
             # Calculate overall risk score
-            overall_risk = self.calculate_overall_weather_risk(risk_factors)
+            overall = np.minimum(1.0, risk_matrix @ self._RISK_WEIGHTS)
             
-            # Determine risk level
-            risk_level = self.determine_weather_risk_level(overall_risk)
+            if risk_matrix.ndim == 1:
+                risk_factors = dict(zip(self._RISK_KEYS, risk_matrix.tolist()))
+                overall_risk = float(overall)
+                risk_level = self.determine_weather_risk_level(overall_risk)
+            else:
+                risk_factors = [dict(zip(self._RISK_KEYS, row)) for row in risk_matrix.tolist()]
+                overall_risk = overall.tolist()
+                risk_level = self.determine_weather_risk_level(overall).tolist()
             
             # Generate risk mitigation strategies
             risk_mitigation = await self.generate_weather_risk_mitigation(risk_factors, overall_risk)
@@ -264,24 +588,137 @@ class WeatherService:
             raise e
     
     # Helper methods for weather data retrieval
+    def _round_coordinate(self, value: float) -> float:
+        """Round a coordinate to the cache key precision"""
+        return round(float(value), self.cache_key_precision)
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Return the upstream concurrency semaphore, creating it on first use
+        
+        Created lazily so it binds to the running event loop on Python < 3.10.
+        """
+        if self._sema is None:
+            self._sema = asyncio.Semaphore(self.max_concurrency)
+        return self._sema
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it on first use
+        
+        Created lazily because the service is constructed before the event loop runs.
+        """
+        if self._session is None or self._session.closed:
+            # Keep-alive connections and a 5 minute DNS cache for the OpenWeather upstream
+            connector = aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=30,
+                keepalive_timeout=75,
+                enable_cleanup_closed=True,
+                ttl_dns_cache=300,
+                use_dns_cache=True
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=8, connect=2),
+                json_serialize=_orjson_dumps_str
+            )
+        return self._session
+    
+    async def close(self) -> None:
+        """Release the HTTP session and Redis connections; call from the app's shutdown hook"""
+        for task in self._refresh_tasks:
+            task.cancel()
+        await asyncio.gather(*self._refresh_tasks, return_exceptions=True)
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        await self.redis.aclose()
+    
+    async def _onecall(
+        self, lat: float, lon: float, etag: Optional[str] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Fetch current, hourly and daily weather in one OneCall request
+        
+        Revalidates with If-None-Match when given the ETag of the cached
+        forecast. Returns the payload and its ETag, with None in place of the
+        payload on 304 Not Modified.
+        """
+        url = _ONECALL_URL.with_query(
+            lat=self._round_coordinate(lat),
+            lon=self._round_coordinate(lon),
+            exclude="minutely,alerts",
+            appid=self.api_key,
+            units="metric"
+        )
+        headers = {"If-None-Match": etag} if etag else {}
+        
+        async with self._get_semaphore():
+            async with self._get_session().get(url, headers=headers) as response:
+                if response.status == 304 and etag:
+                    return None, etag
+                response.raise_for_status()
+                return orjson.loads(await response.read()), response.headers.get("ETag")
+    
+    @staticmethod
+    def _local_time(timestamp: int, offset: int, fmt: str) -> str:
+        """Format a unix timestamp in the location's local time"""
+        return datetime.fromtimestamp(timestamp + offset, tz=timezone.utc).strftime(fmt)
+    
+    def _parse_onecall_current(self, current: Dict[str, Any], offset: int) -> Dict[str, Any]:
+        """Map the OneCall "current" block to the current weather shape"""
+        condition = (current.get("weather") or [{}])[0]
+        return {
+            "temperature": current.get("temp"),
+            "feels_like": current.get("feels_like"),
+            "humidity": current.get("humidity"),
+            "wind_speed": current.get("wind_speed"),
+            "wind_direction": current.get("wind_deg"),
+            "description": condition.get("description", "").capitalize(),
+            "icon": condition.get("icon"),
+            "visibility": current.get("visibility"),
+            "pressure": current.get("pressure"),
+            "sunrise": self._local_time(current.get("sunrise", 0), offset, "%H:%M"),
+            "sunset": self._local_time(current.get("sunset", 0), offset, "%H:%M")
+        }
+    
+    def _parse_onecall_daily(self, day: Dict[str, Any], offset: int) -> Dict[str, Any]:
+        """Map a OneCall "daily" entry to the 5-day forecast shape"""
+        condition = (day.get("weather") or [{}])[0]
+        temperature = day.get("temp", {})
+        return {
+            "date": self._local_time(day.get("dt", 0), offset, "%Y-%m-%d"),
+            "day": self._local_time(day.get("dt", 0), offset, "%A"),
+            "temperature": {
+                "min": temperature.get("min"),
+                "max": temperature.get("max")
+            },
+            "description": condition.get("description", "").capitalize(),
+            "icon": condition.get("icon"),
+            "humidity": day.get("humidity"),
+            "wind_speed": day.get("wind_speed"),
+            "precipitation_probability": round(day.get("pop", 0) * 100)
+        }
+    
+    def _parse_onecall_hourly(self, hour: Dict[str, Any], offset: int) -> Dict[str, Any]:
+        """Map a OneCall "hourly" entry to the hourly forecast shape"""
+        condition = (hour.get("weather") or [{}])[0]
+        return {
+            "hour": int(self._local_time(hour.get("dt", 0), offset, "%H")),
+            "time": self._local_time(hour.get("dt", 0), offset, "%H:%M"),
+            "temperature": hour.get("temp"),
+            "description": condition.get("description", "").capitalize(),
+            "icon": condition.get("icon"),
+            "humidity": hour.get("humidity"),
+            "wind_speed": hour.get("wind_speed"),
+            "precipitation_probability": round(hour.get("pop", 0) * 100)
+        }
+    
     async def get_current_weather(self, lat: float, lon: float) -> Dict[str, Any]:
         """Get current weather for a location"""
         try:
-            # This would use actual weather API
-            # For now, return mock data
-            return {
-                "temperature": 25.0,
-                "feels_like": 27.0,
-                "humidity": 65,
-                "wind_speed": 12.0,
-                "wind_direction": 180,
-                "description": "Partly cloudy",
-                "icon": "02d",
-                "visibility": 10000,
-                "pressure": 1013,
-                "sunrise": "06:30",
-                "sunset": "18:45"
-            }
+            async with self._get_semaphore():
+                # This would use actual weather API
+                # For now, return mock data
+                return _CURRENT_WEATHER_TEMPLATE.copy()
         except Exception as e:
             logger.error(f"Error getting current weather: {e}")
             return {}
@@ -289,24 +726,12 @@ class WeatherService:
     async def get_5day_forecast(self, lat: float, lon: float) -> List[Dict[str, Any]]:
         """Get 5-day weather forecast"""
         try:
-            # Mock 5-day forecast data
-            forecast = []
-            for i in range(5):
-                date = datetime.now() + timedelta(days=i)
-                forecast.append({
-                    "date": date.strftime("%Y-%m-%d"),
-                    "day": date.strftime("%A"),
-                    "temperature": {
-                        "min": 20 + i,
-                        "max": 28 + i
-                    },
-                    "description": "Partly cloudy",
-                    "icon": "02d",
-                    "humidity": 60 + i,
-                    "wind_speed": 10 + i,
-                    "precipitation_probability": 20 + i
-                })
-            return forecast
+            async with self._get_semaphore():
+                # Mock 5-day forecast data
+                return [
+                    {**day, "temperature": day["temperature"].copy()}
+                    for day in _mock_5day_forecast(datetime.now().date())
+                ]
         except Exception as e:
             logger.error(f"Error getting 5-day forecast: {e}")
             return []
@@ -314,21 +739,9 @@ class WeatherService:
     async def get_hourly_forecast(self, lat: float, lon: float) -> List[Dict[str, Any]]:
         """Get hourly weather forecast for next 24 hours"""
         try:
-            # Mock hourly forecast data
-            hourly_forecast = []
-            for hour in range(24):
-                current_hour = datetime.now().replace(hour=hour, minute=0, second=0, microsecond=0)
-                hourly_forecast.append({
-                    "hour": hour,
-                    "time": current_hour.strftime("%H:%M"),
-                    "temperature": 22 + (hour - 12) * 0.5,
-                    "description": "Clear",
-                    "icon": "01d" if 6 <= hour <= 18 else "01n",
-                    "humidity": 65,
-                    "wind_speed": 10,
-                    "precipitation_probability": 10
-                })
-            return hourly_forecast
+            async with self._get_semaphore():
+                # Mock hourly forecast data
+                return [hour.copy() for hour in _HOURLY_FORECAST_TEMPLATE]
         except Exception as e:
             logger.error(f"Error getting hourly forecast: {e}")
             return []
@@ -336,29 +749,7 @@ class WeatherService:
     async def analyze_weather_patterns(self, forecast: List[Dict], hourly_forecast: List[Dict]) -> Dict[str, Any]:
         """Analyze weather patterns for delivery planning"""
         try:
-            # Analyze temperature patterns
-            temperatures = [day["temperature"]["max"] for day in forecast]
-            temp_analysis = {
-                "avg_temperature": np.mean(temperatures),
-                "temperature_range": max(temperatures) - min(temperatures),
-                "temperature_trend": "stable" if abs(temperatures[-1] - temperatures[0]) < 5 else "changing"
-            }
-            
-            # Analyze precipitation patterns
-            precipitation_probs = [day["precipitation_probability"] for day in forecast]
-            precip_analysis = {
-                "avg_precipitation_probability": np.mean(precipitation_probs),
-                "high_precipitation_days": len([p for p in precipitation_probs if p > 50]),
-                "precipitation_trend": "increasing" if precipitation_probs[-1] > precipitation_probs[0] else "decreasing"
-            }
-            
-            # Analyze wind patterns
-            wind_speeds = [day["wind_speed"] for day in forecast]
-            wind_analysis = {
-                "avg_wind_speed": np.mean(wind_speeds),
-                "high_wind_days": len([w for w in wind_speeds if w > 20]),
-                "wind_trend": "increasing" if wind_speeds[-1] > wind_speeds[0] else "decreasing"
-            }
+            temp_analysis, precip_analysis, wind_analysis = _analyze_weather_patterns_sync(forecast, hourly_forecast)
             
             return {
                 "temperature_analysis": temp_analysis,
@@ -444,56 +835,59 @@ class WeatherService:
         # Placeholder implementation
         return {}
     
-    async def calculate_precipitation_risk(self, weather_data: Dict[str, Any]) -> float:
+    def calculate_precipitation_risk(self, weather_data: Dict[str, Any]) -> float:
         """Calculate precipitation risk"""
         # Placeholder implementation
         return 0.3
     
-    async def calculate_wind_risk(self, weather_data: Dict[str, Any]) -> float:
+    def calculate_wind_risk(self, weather_data: Dict[str, Any]) -> float:
         """Calculate wind risk"""
         # Placeholder implementation
         return 0.2
     
-    async def calculate_temperature_risk(self, weather_data: Dict[str, Any]) -> float:
+    def calculate_temperature_risk(self, weather_data: Dict[str, Any]) -> float:
         """Calculate temperature risk"""
         # Placeholder implementation
         return 0.1
     
-    async def calculate_visibility_risk(self, weather_data: Dict[str, Any]) -> float:
+    def calculate_visibility_risk(self, weather_data: Dict[str, Any]) -> float:
         """Calculate visibility risk"""
         # Placeholder implementation
         return 0.15
     
-    async def calculate_road_condition_risk(self, weather_data: Dict[str, Any]) -> float:
+    def calculate_road_condition_risk(self, weather_data: Dict[str, Any]) -> float:
         """Calculate road condition risk"""
         # Placeholder implementation
         return 0.25
     
+    def _risk_vector(self, weather_data: Any) -> np.ndarray:
+        """Build the risk factor vector, ordered as _RISK_KEYS
+        
+        A single weather dict gives a (5,) array; a list of them gives (N, 5).
+        """
+        if isinstance(weather_data, list):
+            return np.array([self._risk_vector(entry) for entry in weather_data], dtype=np.float64).reshape(-1, len(self._RISK_KEYS))
+        return np.array([
+            self.calculate_precipitation_risk(weather_data),
+            self.calculate_wind_risk(weather_data),
+            self.calculate_temperature_risk(weather_data),
+            self.calculate_visibility_risk(weather_data),
+            self.calculate_road_condition_risk(weather_data)
+        ], dtype=np.float64)
+    
     def calculate_overall_weather_risk(self, risk_factors: Dict[str, float]) -> float:
         """Calculate overall weather risk"""
-        weights = {
-            "precipitation_risk": 0.25,
-            "wind_risk": 0.2,
-            "temperature_risk": 0.15,
-            "visibility_risk": 0.2,
-            "road_condition_risk": 0.2
-        }
+        factors = np.array([risk_factors.get(key, 0.0) for key in self._RISK_KEYS], dtype=np.float64)
+        return float(min(1.0, factors @ self._RISK_WEIGHTS))
+    
+    def determine_weather_risk_level(self, risk_score: Any) -> Any:
+        """Determine weather risk level
         
-        overall_risk = sum(risk_factors[factor] * weights[factor] for factor in risk_factors)
-        return min(1.0, overall_risk)
-    
-    def determine_weather_risk_level(self, risk_score: float) -> str:
-        """Determine weather risk level"""
-        if risk_score > 0.8:
-            return "critical"
-        elif risk_score > 0.6:
-            return "high"
-        elif risk_score > 0.4:
-            return "medium"
-        elif risk_score > 0.2:
-            return "low"
-        else:
-            return "minimal"
+        Accepts a scalar score or an array of scores; arrays get an array of labels.
+        """
+        # side="left" keeps each threshold in the lower band (0.8 is "high", not "critical")
+        levels = _RISK_LABELS[np.searchsorted(_RISK_THRESHOLDS, risk_score, side="left")]
+        return str(levels) if np.ndim(levels) == 0 else levels
     
     async def generate_weather_risk_mitigation(self, risk_factors: Dict[str, float], overall_risk: float) -> List[str]:
         """Generate weather risk mitigation strategies"""
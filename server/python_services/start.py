@@ -7,20 +7,28 @@ import uvicorn
 import os
 from config import settings
 
+RELOAD = os.getenv("RELOAD", "0") == "1"
+WORKERS = int(os.getenv("WORKERS", "0")) or os.cpu_count() or 1
+
 def main():
     """Start the FastAPI application"""
     print("🚀 Starting Zipzy Python AI Services...")
     print(f"📊 Version: {settings.PROJECT_NAME}")
     print(f"🌐 Host: 0.0.0.0")
     print(f"🔌 Port: 8000")
+    print(f"👷 Workers: {1 if RELOAD else WORKERS}{' (reload)' if RELOAD else ''}")
     print(f"📚 API Docs: http://localhost:8000/docs")
     print(f"🔍 ReDoc: http://localhost:8000/redoc")
     
+    # uvicorn ignores workers in reload mode; "auto" picks uvloop/httptools when installed
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        reload=RELOAD,
+        workers=1 if RELOAD else WORKERS,
+        loop="auto",
+        http="auto",
         log_level="info"
     )
 
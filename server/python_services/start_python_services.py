@@ -4,11 +4,12 @@ Startup script for Python services
 This script installs dependencies and starts the Python services
 """
 
+import hashlib
 import subprocess
 import sys
 import os
-import time
 import signal
+import threading
 import logging
 from pathlib import Path
 
@@ -19,10 +20,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# uvicorn logs this once the app is serving requests
+READY_MARKER = "Application startup complete"
+READY_TIMEOUT = 15
+
 class PythonServiceManager:
     def __init__(self):
         self.script_dir = Path(__file__).parent
         self.requirements_file = self.script_dir / "requirements.txt"
+        # Kept inside the interpreter's environment, so a new or recreated venv starts without one
+        self.requirements_stamp = Path(sys.prefix) / ".zipzy-python-services-requirements.sha256"
         self.bridge_file = self.script_dir / "integration" / "nodejs_bridge.py"
         self.process = None
         
@@ -46,16 +53,31 @@ class PythonServiceManager:
                 logger.warning("requirements.txt not found, creating basic requirements...")
                 self.create_basic_requirements()
             
-            # Install dependencies
+            # Skip pip entirely when requirements.txt is unchanged since the last successful install
+            # into this same interpreter
+            hasher = hashlib.sha256(os.fsencode(sys.executable) + b"\0")
+            hasher.update(self.requirements_file.read_bytes())
+            digest = hasher.hexdigest()
+            if self.requirements_stamp.exists() and self.requirements_stamp.read_text().strip() == digest:
+                logger.info("Dependencies unchanged since last install, skipping pip")
+                return True
+            
+            # Install dependencies; pip's stdout is not needed and stderr is only decoded on failure
             result = subprocess.run([
-                sys.executable, "-m", "pip", "install", "-r", str(self.requirements_file)
-            ], capture_output=True, text=True, cwd=self.script_dir)
+                sys.executable, "-m", "pip", "install", "--prefer-binary", "--no-input",
+                "-r", str(self.requirements_file)
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, cwd=self.script_dir)
             
             if result.returncode == 0:
+                try:
+                    self.requirements_stamp.write_text(digest)
+                except OSError as e:
+                    # e.g. a read-only system interpreter; pip just runs again next time
+                    logger.debug(f"Could not record installed requirements: {e}")
                 logger.info("Dependencies installed successfully")
                 return True
             else:
-                logger.error(f"Failed to install dependencies: {result.stderr}")
+                logger.error(f"Failed to install dependencies: {result.stderr.decode(errors='replace')}")
                 return False
                 
         except Exception as e:
@@ -70,15 +92,16 @@ pydantic==2.5.0
 numpy==1.24.3
 pandas==2.0.3
 scikit-learn==1.3.0
-tensorflow==2.13.0
+# tensorflow==2.13.0 (install only if needed)
 plotly==5.17.0
-aiohttp==3.9.1
+aiohttp>=3.9,<4
+orjson>=3.9
+uvloop>=0.19; platform_system != 'Windows'
 python-multipart==0.0.6
 python-jose[cryptography]==3.3.0
 passlib[bcrypt]==1.7.4
 python-dotenv==1.0.0
 requests==2.31.0
-asyncio==3.4.3
 joblib==1.3.2
 """
         
@@ -99,24 +122,37 @@ joblib==1.3.2
             # Start the FastAPI server
             self.process = subprocess.Popen([
                 sys.executable, str(self.bridge_file)
-            ], cwd=self.script_dir, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            ], cwd=self.script_dir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=1, text=True)
             
-            # Wait a moment for the service to start
-            time.sleep(3)
+            # Wait for uvicorn to report startup instead of sleeping a fixed time
+            ready = threading.Event()
+            threading.Thread(target=self._pump_output, args=(self.process, ready), daemon=True).start()
+            if not ready.wait(timeout=READY_TIMEOUT):
+                logger.warning(f"No startup message after {READY_TIMEOUT}s, checking process state")
             
             # Check if the process is still running
             if self.process.poll() is None:
                 logger.info("Python services started successfully")
                 return True
             else:
-                stdout, stderr = self.process.communicate()
-                logger.error(f"Failed to start Python services: {stderr.decode()}")
+                logger.error(f"Failed to start Python services (exit code {self.process.returncode})")
                 return False
                 
         except Exception as e:
             logger.error(f"Error starting Python services: {e}")
             return False
     
+    def _pump_output(self, process, ready):
+        """Echo service output, setting ready on the startup marker or when output ends"""
+        # Uses its own reference since stop_services() clears self.process
+        for line in process.stdout:
+            sys.stdout.write(line)
+            if not ready.is_set() and READY_MARKER in line:
+                ready.set()
+        # Output closed: reap the exited process so poll() sees it, then stop waiting
+        process.wait()
+        ready.set()
+    
     def stop_services(self):
         """Stop Python services"""
         if self.process:
@@ -161,15 +197,11 @@ joblib==1.3.2
             return False
         
         try:
-            # Keep the process running
+            # Block until the service exits; SIGINT/SIGTERM are handled by signal_handler
             logger.info("Python services are running. Press Ctrl+C to stop.")
-            while True:
-                time.sleep(1)
-                
-                # Check if process is still running
-                if self.process and self.process.poll() is not None:
-                    logger.error("Python services process died unexpectedly")
-                    return False
+            returncode = self.process.wait()
+            logger.error(f"Python services process died unexpectedly (exit code {returncode})")
+            return False
                     
         except KeyboardInterrupt:
             logger.info("Received keyboard interrupt")
@@ -6,10 +6,10 @@ This script tests all Python services and their integration with Node.js
 
 import asyncio
 import aiohttp
-import json
+import orjson
 import time
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple, Union
 from datetime import datetime, timedelta
 
 # Configure logging
@@ -19,36 +19,336 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Static request payloads; timestamp sentinels are filled in once per run by _render_payload
+_ANALYTICS_TEMPLATE = {
+    "orders": [
+        {
+            "id": "order_1",
+            "total_amount": 150.0,
+            "status": "delivered",
+            "created_at": "__NOW__",
+            "customer_id": "customer_1"
+        },
+        {
+            "id": "order_2", 
+            "total_amount": 200.0,
+            "status": "pending",
+            "created_at": "__NOW__",
+            "customer_id": "customer_2"
+        }
+    ],
+    "customers": [
+        {
+            "id": "customer_1",
+            "name": "John Doe",
+            "total_spent": 500.0,
+            "order_count": 5,
+            "created_at": "__NOW_MINUS_30D__"
+        }
+    ],
+    "deliveries": [
+        {
+            "id": "delivery_1",
+            "order_id": "order_1",
+            "status": "delivered",
+            "delivery_time": 25.0,
+            "distance": 5.2,
+            "rating": 4.5,
+            "created_at": "__NOW__"
+        }
+    ]
+}
+
+_RECOMMENDATION_TEMPLATE = {
+    "user_id": "user_1",
+    "user_preferences": {
+        "preferred_categories": ["pizza", "burger"],
+        "price_range": [50, 300],
+        "dietary_restrictions": []
+    },
+    "product_catalog": [
+        {
+            "id": "product_1",
+            "name": "Margherita Pizza",
+            "category": "pizza",
+            "price": 150.0,
+            "rating": 4.5
+        },
+        {
+            "id": "product_2",
+            "name": "Chicken Burger",
+            "category": "burger", 
+            "price": 120.0,
+            "rating": 4.2
+        }
+    ],
+    "user_history": [
+        {
+            "user_id": "user_1",
+            "product_id": "product_1",
+            "rating": 5,
+            "order_date": "__NOW__"
+        }
+    ]
+}
+
+_FRAUD_TEMPLATE = {
+    "order": {
+        "id": "order_1",
+        "total_amount": 150.0,
+        "customer_age_days": 5,
+        "payment_method": "upi",
+        "items": [{"id": "item_1", "quantity": 2}],
+        "delivery_distance": 3.5
+    },
+    "customer": {
+        "id": "customer_1",
+        "customer_age_days": 5,
+        "order_count": 1,
+        "rating": 0,
+        "account_age_days": 5
+    },
+    "payment": {
+        "amount": 150.0,
+        "card_age_days": 0,
+        "card_usage_frequency": 1
+    }
+}
+
+_DEMAND_TEMPLATE = {
+    "historical_orders": [
+        {
+            "date": "__NOW_MINUS_1D__",
+            "order_count": 25,
+            "total_amount": 5000.0
+        },
+        {
+            "date": "__NOW_MINUS_2D__",
+            "order_count": 30,
+            "total_amount": 6000.0
+        }
+    ],
+    "weather_data": {
+        "temperature": 25.0,
+        "humidity": 60.0,
+        "condition": "sunny"
+    },
+    "events": []
+}
+
+_ROUTE_TEMPLATE = {
+    "deliveries": [
+        {
+            "id": "delivery_1",
+            "pickup_location": {"lat": 28.6139, "lng": 77.2090},
+            "delivery_location": {"lat": 28.6141, "lng": 77.2092},
+            "priority": "high",
+            "time_window": {"start": "10:00", "end": "12:00"}
+        },
+        {
+            "id": "delivery_2",
+            "pickup_location": {"lat": 28.6140, "lng": 77.2091},
+            "delivery_location": {"lat": 28.6142, "lng": 77.2093},
+            "priority": "medium",
+            "time_window": {"start": "11:00", "end": "13:00"}
+        }
+    ],
+    "partners": [
+        {
+            "id": "partner_1",
+            "location": {"lat": 28.6138, "lng": 77.2089},
+            "capacity": 5,
+            "rating": 4.5
+        }
+    ]
+}
+
+_NLP_TEMPLATE = {
+    "text": "The food was amazing! Great service and fast delivery. Highly recommended!",
+    "type": "review"
+}
+
+_BATCH_TEMPLATE = {
+    "tasks": [
+        {
+            "id": "task_1",
+            "type": "analytics",
+            "data": {
+                "orders": [{"id": "order_1", "total_amount": 100.0, "status": "delivered"}]
+            }
+        },
+        {
+            "id": "task_2",
+            "type": "recommendations",
+            "data": {
+                "user_id": "user_1",
+                "product_catalog": [{"id": "product_1", "name": "Pizza", "price": 150.0}]
+            }
+        }
+    ]
+}
+
+# Timestamp sentinels and how far before the run start each one is
+_TIMESTAMP_SENTINELS = {
+    "__NOW__": timedelta(0),
+    "__NOW_MINUS_1D__": timedelta(days=1),
+    "__NOW_MINUS_2D__": timedelta(days=2),
+    "__NOW_MINUS_30D__": timedelta(days=30)
+}
+
+_PAYLOAD_TEMPLATES = {
+    "analytics": _ANALYTICS_TEMPLATE,
+    "recommendation": _RECOMMENDATION_TEMPLATE,
+    "fraud": _FRAUD_TEMPLATE,
+    "demand": _DEMAND_TEMPLATE,
+    "route": _ROUTE_TEMPLATE,
+    "nlp": _NLP_TEMPLATE,
+    "batch": _BATCH_TEMPLATE
+}
+
+# (test name, endpoint) pairs per service group; results are recorded as "<group>_<test name>"
+_ENDPOINT_GROUPS: Dict[str, List[Tuple[str, str]]] = {
+    "analytics": [
+        ("daily_report", "/api/analytics/daily-report"),
+        ("customer_segments", "/api/analytics/customer-segments"),
+        ("delivery_metrics", "/api/analytics/delivery-metrics"),
+        ("revenue_trends", "/api/analytics/revenue-trends"),
+        ("partner_performance", "/api/analytics/partner-performance")
+    ],
+    "recommendation": [
+        ("product_recommendations", "/api/recommendations/products"),
+        ("delivery_recommendations", "/api/recommendations/delivery"),
+        ("menu_recommendations", "/api/recommendations/menu"),
+        ("promotional_recommendations", "/api/recommendations/promotional")
+    ],
+    "fraud": [
+        ("fake_orders", "/api/fraud/orders"),
+        ("payment_fraud", "/api/fraud/payments"),
+        ("account_takeover", "/api/fraud/accounts"),
+        ("delivery_fraud", "/api/fraud/delivery")
+    ],
+    "demand": [
+        ("daily_forecast", "/api/demand/daily-forecast"),
+        ("hourly_forecast", "/api/demand/hourly-forecast")
+    ],
+    "route": [
+        ("optimization", "/api/route/optimize")
+    ],
+    "nlp": [
+        ("sentiment_analysis", "/api/nlp/sentiment"),
+        ("text_classification", "/api/nlp/classify")
+    ],
+    "batch": [
+        ("processing", "/api/batch/process")
+    ]
+}
+
+def _render_payload(template: Dict[str, Any], now: datetime) -> bytes:
+    """Encode a payload template to JSON bytes with its timestamp sentinels filled in"""
+    body = orjson.dumps(template)
+    for sentinel, offset in _TIMESTAMP_SENTINELS.items():
+        body = body.replace(orjson.dumps(sentinel), orjson.dumps((now - offset).isoformat()))
+    return body
+
 class PythonServiceTester:
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.base_url = base_url.rstrip('/')
         self.session = None
         self.test_results = {}
+        # Keep loopback connections to the service warm and reused across every test
+        self._connector_kwargs = {
+            "limit": 0,
+            "limit_per_host": 64,
+            "keepalive_timeout": 75,
+            "ttl_dns_cache": 300
+        }
+        self._json_headers = {"Content-Type": "application/json"}
+        self._payloads: Dict[str, bytes] = {}
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(**self._connector_kwargs),
+            timeout=aiohttp.ClientTimeout(total=30),
+            json_serialize=lambda obj: orjson.dumps(obj).decode()
+        )
+        await self._warm_up()
         return self
     
+    async def _warm_up(self, timeout: float = 5.0, backoff: float = 0.1) -> None:
+        """Hit /health until the service answers so lazy imports happen before the timed tests"""
+        url = f"{self.base_url}/health"
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                async with self.session.get(url) as response:
+                    await response.read()
+                    return
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if time.monotonic() >= deadline:
+                    logger.warning("Python services did not answer the warm-up probe")
+                    return
+                await asyncio.sleep(backoff)
+    
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             await self.session.close()
     
-    async def make_request(self, method: str, endpoint: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Make HTTP request to Python services"""
+    async def make_request(self, method: str, endpoint: str, data: Union[Dict[str, Any], bytes] = None) -> Dict[str, Any]:
+        """Make HTTP request to Python services
+        
+        POST data may be a dict or JSON bytes that were already encoded.
+        """
         url = f"{self.base_url}{endpoint}"
         
         try:
             if method.upper() == "GET":
                 async with self.session.get(url) as response:
-                    result = await response.json()
+                    result = orjson.loads(await response.read())
                     return {"success": response.status == 200, "data": result, "status": response.status}
             elif method.upper() == "POST":
-                async with self.session.post(url, json=data) as response:
-                    result = await response.json()
-                    return {"success": response.status == 200, "data": result, "status": response.status}
+                body = data if isinstance(data, bytes) else orjson.dumps(data)
+                return await self._post_bytes(endpoint, body)
+        except Exception as e:
+            return {"success": False, "error": str(e), "status": 0}
+    
+    async def _post_bytes(self, endpoint: str, body: bytes) -> Dict[str, Any]:
+        """POST a pre-encoded JSON body to Python services"""
+        url = f"{self.base_url}{endpoint}"
+        
+        try:
+            async with self.session.post(url, data=body, headers=self._json_headers) as response:
+                result = orjson.loads(await response.read())
+                return {"success": response.status == 200, "data": result, "status": response.status}
         except Exception as e:
             return {"success": False, "error": str(e), "status": 0}
     
+    def _prepare_payloads(self, now: datetime) -> None:
+        """Render every request payload once, stamped with a single timestamp"""
+        self._payloads = {name: _render_payload(template, now) for name, template in _PAYLOAD_TEMPLATES.items()}
+    
+    def _payload(self, name: str) -> bytes:
+        """Return a rendered payload, rendering all of them if needed"""
+        if not self._payloads:
+            self._prepare_payloads(datetime.now())
+        return self._payloads[name]
+    
+    async def _run_endpoint_group(self, prefix: str, endpoints: List[Tuple[str, str]], body: bytes) -> bool:
+        """POST the same encoded payload to every endpoint in a group concurrently and record results"""
+        for test_name, _ in endpoints:
+            logger.info(f"Testing {test_name}...")
+        
+        results = await asyncio.gather(*(self._post_bytes(endpoint, body) for _, endpoint in endpoints))
+        
+        for (test_name, _), result in zip(endpoints, results):
+            if result["success"]:
+                logger.info(f"✅ {test_name} passed")
+                self.test_results[f"{prefix}_{test_name}"] = {"status": "PASS", "data": result["data"]}
+            else:
+                logger.error(f"❌ {test_name} failed: {result.get('error', 'Unknown error')}")
+                self.test_results[f"{prefix}_{test_name}"] = {"status": "FAIL", "error": result.get("error")}
+        
+        return all(result["success"] for result in results)
+    
     async def test_health_check(self) -> bool:
         """Test health check endpoint"""
         logger.info("Testing health check...")
@@ -66,350 +366,48 @@ class PythonServiceTester:
     async def test_analytics_services(self) -> bool:
         """Test analytics services"""
         logger.info("Testing analytics services...")
-        
-        # Sample data for testing
-        test_data = {
-            "orders": [
-                {
-                    "id": "order_1",
-                    "total_amount": 150.0,
-                    "status": "delivered",
-                    "created_at": datetime.now().isoformat(),
-                    "customer_id": "customer_1"
-                },
-                {
-                    "id": "order_2", 
-                    "total_amount": 200.0,
-                    "status": "pending",
-                    "created_at": datetime.now().isoformat(),
-                    "customer_id": "customer_2"
-                }
-            ],
-            "customers": [
-                {
-                    "id": "customer_1",
-                    "name": "John Doe",
-                    "total_spent": 500.0,
-                    "order_count": 5,
-                    "created_at": (datetime.now() - timedelta(days=30)).isoformat()
-                }
-            ],
-            "deliveries": [
-                {
-                    "id": "delivery_1",
-                    "order_id": "order_1",
-                    "status": "delivered",
-                    "delivery_time": 25.0,
-                    "distance": 5.2,
-                    "rating": 4.5,
-                    "created_at": datetime.now().isoformat()
-                }
-            ]
-        }
-        
-        analytics_tests = [
-            ("daily_report", "/api/analytics/daily-report"),
-            ("customer_segments", "/api/analytics/customer-segments"),
-            ("delivery_metrics", "/api/analytics/delivery-metrics"),
-            ("revenue_trends", "/api/analytics/revenue-trends"),
-            ("partner_performance", "/api/analytics/partner-performance")
-        ]
-        
-        all_passed = True
-        
-        for test_name, endpoint in analytics_tests:
-            logger.info(f"Testing {test_name}...")
-            result = await self.make_request("POST", endpoint, test_data)
-            
-            if result["success"]:
-                logger.info(f"✅ {test_name} passed")
-                self.test_results[f"analytics_{test_name}"] = {"status": "PASS", "data": result["data"]}
-            else:
-                logger.error(f"❌ {test_name} failed: {result.get('error', 'Unknown error')}")
-                self.test_results[f"analytics_{test_name}"] = {"status": "FAIL", "error": result.get("error")}
-                all_passed = False
-        
-        return all_passed
+        return await self._run_endpoint_group("analytics", _ENDPOINT_GROUPS["analytics"], self._payload("analytics"))
     
     async def test_recommendation_services(self) -> bool:
         """Test recommendation services"""
         logger.info("Testing recommendation services...")
-        
-        # Sample data for testing
-        test_data = {
-            "user_id": "user_1",
-            "user_preferences": {
-                "preferred_categories": ["pizza", "burger"],
-                "price_range": [50, 300],
-                "dietary_restrictions": []
-            },
-            "product_catalog": [
-                {
-                    "id": "product_1",
-                    "name": "Margherita Pizza",
-                    "category": "pizza",
-                    "price": 150.0,
-                    "rating": 4.5
-                },
-                {
-                    "id": "product_2",
-                    "name": "Chicken Burger",
-                    "category": "burger", 
-                    "price": 120.0,
-                    "rating": 4.2
-                }
-            ],
-            "user_history": [
-                {
-                    "user_id": "user_1",
-                    "product_id": "product_1",
-                    "rating": 5,
-                    "order_date": datetime.now().isoformat()
-                }
-            ]
-        }
-        
-        recommendation_tests = [
-            ("product_recommendations", "/api/recommendations/products"),
-            ("delivery_recommendations", "/api/recommendations/delivery"),
-            ("menu_recommendations", "/api/recommendations/menu"),
-            ("promotional_recommendations", "/api/recommendations/promotional")
-        ]
-        
-        all_passed = True
-        
-        for test_name, endpoint in recommendation_tests:
-            logger.info(f"Testing {test_name}...")
-            result = await self.make_request("POST", endpoint, test_data)
-            
-            if result["success"]:
-                logger.info(f"✅ {test_name} passed")
-                self.test_results[f"recommendation_{test_name}"] = {"status": "PASS", "data": result["data"]}
-            else:
-                logger.error(f"❌ {test_name} failed: {result.get('error', 'Unknown error')}")
-                self.test_results[f"recommendation_{test_name}"] = {"status": "FAIL", "error": result.get("error")}
-                all_passed = False
-        
-        return all_passed
+        return await self._run_endpoint_group("recommendation", _ENDPOINT_GROUPS["recommendation"], self._payload("recommendation"))
     
     async def test_fraud_detection_services(self) -> bool:
         """Test fraud detection services"""
         logger.info("Testing fraud detection services...")
-        
-        # Sample data for testing
-        test_data = {
-            "order": {
-                "id": "order_1",
-                "total_amount": 150.0,
-                "customer_age_days": 5,
-                "payment_method": "upi",
-                "items": [{"id": "item_1", "quantity": 2}],
-                "delivery_distance": 3.5
-            },
-            "customer": {
-                "id": "customer_1",
-                "customer_age_days": 5,
-                "order_count": 1,
-                "rating": 0,
-                "account_age_days": 5
-            },
-            "payment": {
-                "amount": 150.0,
-                "card_age_days": 0,
-                "card_usage_frequency": 1
-            }
-        }
-        
-        fraud_tests = [
-            ("fake_orders", "/api/fraud/orders"),
-            ("payment_fraud", "/api/fraud/payments"),
-            ("account_takeover", "/api/fraud/accounts"),
-            ("delivery_fraud", "/api/fraud/delivery")
-        ]
-        
-        all_passed = True
-        
-        for test_name, endpoint in fraud_tests:
-            logger.info(f"Testing {test_name}...")
-            result = await self.make_request("POST", endpoint, test_data)
-            
-            if result["success"]:
-                logger.info(f"✅ {test_name} passed")
-                self.test_results[f"fraud_{test_name}"] = {"status": "PASS", "data": result["data"]}
-            else:
-                logger.error(f"❌ {test_name} failed: {result.get('error', 'Unknown error')}")
-                self.test_results[f"fraud_{test_name}"] = {"status": "FAIL", "error": result.get("error")}
-                all_passed = False
-        
-        return all_passed
+        return await self._run_endpoint_group("fraud", _ENDPOINT_GROUPS["fraud"], self._payload("fraud"))
     
     async def test_demand_prediction_services(self) -> bool:
         """Test demand prediction services"""
         logger.info("Testing demand prediction services...")
-        
-        # Sample data for testing
-        test_data = {
-            "historical_orders": [
-                {
-                    "date": (datetime.now() - timedelta(days=1)).isoformat(),
-                    "order_count": 25,
-                    "total_amount": 5000.0
-                },
-                {
-                    "date": (datetime.now() - timedelta(days=2)).isoformat(),
-                    "order_count": 30,
-                    "total_amount": 6000.0
-                }
-            ],
-            "weather_data": {
-                "temperature": 25.0,
-                "humidity": 60.0,
-                "condition": "sunny"
-            },
-            "events": []
-        }
-        
-        demand_tests = [
-            ("daily_forecast", "/api/demand/daily-forecast"),
-            ("hourly_forecast", "/api/demand/hourly-forecast")
-        ]
-        
-        all_passed = True
-        
-        for test_name, endpoint in demand_tests:
-            logger.info(f"Testing {test_name}...")
-            result = await self.make_request("POST", endpoint, test_data)
-            
-            if result["success"]:
-                logger.info(f"✅ {test_name} passed")
-                self.test_results[f"demand_{test_name}"] = {"status": "PASS", "data": result["data"]}
-            else:
-                logger.error(f"❌ {test_name} failed: {result.get('error', 'Unknown error')}")
-                self.test_results[f"demand_{test_name}"] = {"status": "FAIL", "error": result.get("error")}
-                all_passed = False
-        
-        return all_passed
+        return await self._run_endpoint_group("demand", _ENDPOINT_GROUPS["demand"], self._payload("demand"))
     
     async def test_route_optimization_services(self) -> bool:
         """Test route optimization services"""
         logger.info("Testing route optimization services...")
-        
-        # Sample data for testing
-        test_data = {
-            "deliveries": [
-                {
-                    "id": "delivery_1",
-                    "pickup_location": {"lat": 28.6139, "lng": 77.2090},
-                    "delivery_location": {"lat": 28.6141, "lng": 77.2092},
-                    "priority": "high",
-                    "time_window": {"start": "10:00", "end": "12:00"}
-                },
-                {
-                    "id": "delivery_2",
-                    "pickup_location": {"lat": 28.6140, "lng": 77.2091},
-                    "delivery_location": {"lat": 28.6142, "lng": 77.2093},
-                    "priority": "medium",
-                    "time_window": {"start": "11:00", "end": "13:00"}
-                }
-            ],
-            "partners": [
-                {
-                    "id": "partner_1",
-                    "location": {"lat": 28.6138, "lng": 77.2089},
-                    "capacity": 5,
-                    "rating": 4.5
-                }
-            ]
-        }
-        
-        logger.info("Testing route optimization...")
-        result = await self.make_request("POST", "/api/route/optimize", test_data)
-        
-        if result["success"]:
-            logger.info("✅ Route optimization passed")
-            self.test_results["route_optimization"] = {"status": "PASS", "data": result["data"]}
-            return True
-        else:
-            logger.error(f"❌ Route optimization failed: {result.get('error', 'Unknown error')}")
-            self.test_results["route_optimization"] = {"status": "FAIL", "error": result.get("error")}
-            return False
+        return await self._run_endpoint_group("route", _ENDPOINT_GROUPS["route"], self._payload("route"))
     
     async def test_nlp_services(self) -> bool:
         """Test NLP services"""
         logger.info("Testing NLP services...")
-        
-        # Sample data for testing
-        test_data = {
-            "text": "The food was amazing! Great service and fast delivery. Highly recommended!",
-            "type": "review"
-        }
-        
-        nlp_tests = [
-            ("sentiment_analysis", "/api/nlp/sentiment"),
-            ("text_classification", "/api/nlp/classify")
-        ]
-        
-        all_passed = True
-        
-        for test_name, endpoint in nlp_tests:
-            logger.info(f"Testing {test_name}...")
-            result = await self.make_request("POST", endpoint, test_data)
-            
-            if result["success"]:
-                logger.info(f"✅ {test_name} passed")
-                self.test_results[f"nlp_{test_name}"] = {"status": "PASS", "data": result["data"]}
-            else:
-                logger.error(f"❌ {test_name} failed: {result.get('error', 'Unknown error')}")
-                self.test_results[f"nlp_{test_name}"] = {"status": "FAIL", "error": result.get("error")}
-                all_passed = False
-        
-        return all_passed
+        return await self._run_endpoint_group("nlp", _ENDPOINT_GROUPS["nlp"], self._payload("nlp"))
     
     async def test_batch_processing(self) -> bool:
         """Test batch processing"""
         logger.info("Testing batch processing...")
-        
-        # Sample batch data
-        batch_data = {
-            "tasks": [
-                {
-                    "id": "task_1",
-                    "type": "analytics",
-                    "data": {
-                        "orders": [{"id": "order_1", "total_amount": 100.0, "status": "delivered"}]
-                    }
-                },
-                {
-                    "id": "task_2",
-                    "type": "recommendations",
-                    "data": {
-                        "user_id": "user_1",
-                        "product_catalog": [{"id": "product_1", "name": "Pizza", "price": 150.0}]
-                    }
-                }
-            ]
-        }
-        
-        result = await self.make_request("POST", "/api/batch/process", batch_data)
-        
-        if result["success"]:
-            logger.info("✅ Batch processing passed")
-            self.test_results["batch_processing"] = {"status": "PASS", "data": result["data"]}
-            return True
-        else:
-            logger.error(f"❌ Batch processing failed: {result.get('error', 'Unknown error')}")
-            self.test_results["batch_processing"] = {"status": "FAIL", "error": result.get("error")}
-            return False
+        return await self._run_endpoint_group("batch", _ENDPOINT_GROUPS["batch"], self._payload("batch"))
     
     async def run_all_tests(self) -> Dict[str, Any]:
         """Run all tests and return results"""
         logger.info("Starting comprehensive Python services integration test...")
         
         start_time = time.time()
+        self._prepare_payloads(datetime.now())
         
-        # Run all tests
-        tests = [
-            ("Health Check", self.test_health_check),
+        # The health check runs first; the independent groups then run concurrently
+        health = ("Health Check", self.test_health_check)
+        parallel_group = [
             ("Analytics Services", self.test_analytics_services),
             ("Recommendation Services", self.test_recommendation_services),
             ("Fraud Detection Services", self.test_fraud_detection_services),
@@ -420,21 +418,38 @@ class PythonServiceTester:
         ]
         
         test_results = {}
-        total_tests = len(tests)
+        total_tests = 1 + len(parallel_group)
         passed_tests = 0
         
-        for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running {health[0]}...")
+        logger.info(f"{'='*50}")
+        
+        try:
+            healthy = await health[1]()
+        except Exception as e:
+            logger.error(f"❌ {health[0]} failed with exception: {e}")
+            healthy = False
+        test_results[health[0]] = healthy
+        
+        if healthy:
+            passed_tests += 1
+            
             logger.info(f"\n{'='*50}")
-            logger.info(f"Running {test_name}...")
+            logger.info(f"Running {len(parallel_group)} test groups concurrently...")
             logger.info(f"{'='*50}")
             
-            try:
-                result = await test_func()
+            results = await asyncio.gather(*(test_func() for _, test_func in parallel_group), return_exceptions=True)
+            for (test_name, _), result in zip(parallel_group, results):
+                if isinstance(result, Exception):
+                    logger.error(f"❌ {test_name} failed with exception: {result}")
+                    result = False
                 test_results[test_name] = result
                 if result:
                     passed_tests += 1
-            except Exception as e:
-                logger.error(f"❌ {test_name} failed with exception: {e}")
+        else:
+            logger.error("❌ Skipping remaining tests because the health check failed")
+            for test_name, _ in parallel_group:
                 test_results[test_name] = False
         
         end_time = time.time()
@@ -470,8 +485,12 @@ async def main():
         results = await tester.run_all_tests()
         
         # Save results to file
-        with open("test_results.json", "w") as f:
-            json.dump(results, f, indent=2)
+        with open("test_results.json", "wb") as f:
+            f.write(orjson.dumps(
+                results,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY,
+                default=str
+            ))
         
         logger.info("Test results saved to test_results.json")
         
@@ -484,5 +503,10 @@ async def main():
             return 1
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     exit_code = asyncio.run(main())
     exit(exit_code)
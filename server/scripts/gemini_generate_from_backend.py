@@ -17,17 +17,40 @@ Usage
 
 from __future__ import annotations
 
-import base64
+import binascii
 import csv
+import itertools
 import os
 import sys
-from typing import Any, Dict, List
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 PLACEHOLDER_URL = "https://via.placeholder.com/150"
+_PROMPT_PREFIX = "High quality studio product photo of "
+_PROMPT_SUFFIX = ", plain neutral background, soft shadows, centered, photorealistic, 1:1."
+_DATA_URL_PREFIX = b"data:image/png;base64,"
 BACKEND_URL = os.environ.get("BACKEND_URL", "http://localhost:5000")
 PRODUCTS_API = f"{BACKEND_URL}/api/products"
+MAX_WORKERS = int(os.environ.get("GEMINI_MAX_WORKERS", "8"))
+# Image calls submitted ahead of the CSV writer; bounds how many finished data URLs wait in memory
+SUBMIT_AHEAD = MAX_WORKERS * 2
+
+# Loaded on first use and reused by later runs in the same process
+_API_KEY: Optional[str] = None
+_MODEL = None
+_LOCK = threading.Lock()
+
+# Shared keep-alive session so repeated backend requests reuse connections
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64, max_retries=Retry(total=3, backoff_factor=0.3))
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
 
 
 def load_api_key() -> str:
@@ -46,7 +69,7 @@ def load_api_key() -> str:
 
 
 def fetch_products() -> List[Dict[str, Any]]:
-    res = requests.get(PRODUCTS_API, timeout=20)
+    res = SESSION.get(PRODUCTS_API, timeout=20)
     res.raise_for_status()
     data = res.json()
     products = data.get("products") or []
@@ -62,10 +85,9 @@ def setup_gemini(api_key: str):
     return genai.GenerativeModel("imagen-3.0")
 
 
+@lru_cache(maxsize=1024)
 def prompt_for(name: str) -> str:
-    return (
-        f"High quality studio product photo of {name}, plain neutral background, soft shadows, centered, photorealistic, 1:1."
-    )
+    return _PROMPT_PREFIX + name + _PROMPT_SUFFIX
 
 
 def generate_image_data_url(model, prompt: str, size: str = "512x512") -> str:
@@ -75,27 +97,38 @@ def generate_image_data_url(model, prompt: str, size: str = "512x512") -> str:
     img = response.images[0]
     data_bytes = getattr(img, "data", None)
     if isinstance(data_bytes, bytes):
-        b64 = base64.b64encode(data_bytes).decode("ascii")
+        return b"".join((_DATA_URL_PREFIX, binascii.b2a_base64(data_bytes, newline=False))).decode("ascii")
     elif isinstance(data_bytes, str):
-        b64 = data_bytes
+        return _DATA_URL_PREFIX.decode("ascii") + data_bytes
     else:
         raise RuntimeError("Unexpected image payload type")
-    return f"data:image/png;base64,{b64}"
 
 
-def main() -> int:
+def generate_or_placeholder(model, name: str) -> Tuple[str, str]:
+    """Return (imageUrl, status), falling back to the placeholder on failure."""
     try:
-        api_key = load_api_key()
+        return generate_image_data_url(model, prompt_for(name), size="512x512"), "ok"
     except Exception as e:
-        print(e)
-        return 1
+        return PLACEHOLDER_URL, f"fail -> placeholder ({e})"
 
-    # Try to init model; if fails, we fallback to placeholder for all
-    model = None
-    try:
-        model = setup_gemini(api_key)
-    except Exception as e:
-        print(f"[warn] Gemini init failed: {e}")
+
+def main() -> int:
+    global _API_KEY, _MODEL
+    with _LOCK:
+        if _API_KEY is None:
+            try:
+                _API_KEY = load_api_key()
+            except Exception as e:
+                print(e)
+                return 1
+
+        # Try to init model; if fails, we fallback to placeholder for all
+        if _MODEL is None:
+            try:
+                _MODEL = setup_gemini(_API_KEY)
+            except Exception as e:
+                print(f"[warn] Gemini init failed: {e}")
+        model = _MODEL
 
     try:
         products = fetch_products()
@@ -103,36 +136,54 @@ def main() -> int:
         print(f"Failed to fetch products: {e}")
         return 1
 
-    out_rows: List[Dict[str, str]] = []
-    total = len(products)
-    for idx, p in enumerate(products, start=1):
-        pid = str(p.get("id") or p.get("_id") or "")
-        name = (p.get("name") or "").strip()
-        print(f"[{idx}/{total}] {name} …", end=" ")
-        image_url = PLACEHOLDER_URL
-
-        if name and model:
-            try:
-                image_url = generate_image_data_url(model, prompt_for(name), size="512x512")
-                print("ok")
-            except Exception as e:
-                image_url = PLACEHOLDER_URL
-                print(f"fail -> placeholder ({e})")
-        else:
-            print("placeholder")
-
-        out_rows.append({"id": pid, "name": name, "imageUrl": image_url})
+    tasks = [
+        (idx, str(p.get("id") or p.get("_id") or ""), (p.get("name") or "").strip())
+        for idx, p in enumerate(products, start=1)
+    ]
 
     out_path = "products_with_images.csv"
     try:
-        with open(out_path, "w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=["id", "name", "imageUrl"])
-            w.writeheader()
-            for r in out_rows:
-                w.writerow(r)
+        f = open(out_path, "w", newline="", encoding="utf-8")
+    except Exception as e:
+        print(f"Failed to write {out_path}: {e}")
+        return 1
+
+    total = len(tasks)
+    try:
+        w = csv.writer(f)
+        w.writerow(["id", "name", "imageUrl"])
+        # Image calls are network bound, so overlap them across threads and collect in input order
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            to_generate = ((idx, name) for idx, _, name in tasks if name and model)
+            futures: Dict[int, Future] = {}
+
+            def submit_ahead() -> None:
+                # Top the window back up in input order as rows are written
+                for idx, name in itertools.islice(to_generate, SUBMIT_AHEAD - len(futures)):
+                    futures[idx] = executor.submit(generate_or_placeholder, model, name)
+
+            try:
+                submit_ahead()
+                for idx, pid, name in tasks:
+                    if idx in futures:
+                        # Pop so the finished data URL is freed once its row is written
+                        image_url, status = futures.pop(idx).result()
+                        submit_ahead()
+                    else:
+                        image_url, status = PLACEHOLDER_URL, "placeholder"
+                    print(f"[{idx}/{total}] {name} … {status}")
+                    w.writerow([pid, name, image_url])
+                    f.flush()
+            except BaseException:
+                # Don't let the executor wait on (and pay for) calls whose results can't be written
+                for future in futures.values():
+                    future.cancel()
+                raise
     except Exception as e:
         print(f"Failed to write {out_path}: {e}")
         return 1
+    finally:
+        f.close()
 
     print(f"\nDone. Wrote {out_path}")
     return 0
@@ -14,25 +14,53 @@ Usage (from repo root):
       On macOS/Linux:         export GEMINI_API_KEY="<YOUR_KEY>"
   - Run:
       python server/scripts/gemini_generate_images.py --in products.csv --out products_with_images.csv
+  - Optional: --concurrency N sets how many Gemini requests run at once (default 8); the API has no
+    batch image endpoint, so raise this (within your --rate quota) to generate more images in parallel
+  - Optional: --rate R caps Gemini requests per second to stay within quota (default 2)
+  - Optional: --image-dir images saves each PNG as images/<id>.png and stores that path as imageUrl
+  - Results are cached in image_cache.db so re-runs skip prompts generated before; pass --no-cache to
+    regenerate everything
+  - Optional: --verify-existing checks existing http(s) imageUrls with a HEAD request and regenerates
+    only the broken ones (needs aiohttp)
 
 Notes
-- This script returns data URLs (data:image/png;base64,...) as "imageUrl" values so you can store them
-  immediately. If you prefer actual hosted URLs, you can modify the script to upload the bytes to your
-  storage (e.g. S3/GCS/Imgur) and place that URL instead.
+- By default this script returns data URLs (data:image/png;base64,...) as "imageUrl" values so you can
+  store them immediately. With --image-dir the PNGs are written to disk instead, which keeps the CSV
+  small; upload that directory to your storage (e.g. S3/GCS/Imgur) and rewrite the paths as needed.
 - If the API call fails, a placeholder URL is inserted: https://via.placeholder.com/150
-- The script is written defensively with clear logging and error handling.
+- The script is written defensively with clear logging and error handling. Progress is logged to
+  stderr, one line per product.
 """
 
 from __future__ import annotations
 
 import argparse
-import base64
+import asyncio
+import binascii
 import csv
+import logging
 import os
+import re
 import sys
-from typing import Dict, List
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Optional, TextIO, Tuple, Union
+
+from image_cache import DEFAULT_CACHE_PATH, ImageCache
+from rate_limit import AsyncTokenBucket
+from script_logging import queued_logging
+
+log = logging.getLogger(__name__)
 
 PLACEHOLDER_URL = "https://via.placeholder.com/150"
+MODEL_NAME = "imagen-3.0"
+_DATA_URL_PREFIX = b"data:image/png;base64,"
+_REQUIRED_COLUMNS = {"id", "name", "imageUrl"}
+# Gemini's quota errors carry no Retry-After, so back off this long after one
+RATE_LIMIT_BACKOFF = 10.0
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9._-]")
 
 
 def load_api_key() -> str:
@@ -57,23 +85,30 @@ def load_api_key() -> str:
 def read_products_csv(path: str) -> List[Dict[str, str]]:
     rows: List[Dict[str, str]] = []
     with open(path, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        required = {"id", "name", "imageUrl"}
-        if not required.issubset(set(reader.fieldnames or [])):
-            raise ValueError(
-                f"Input CSV must contain columns: id,name,imageUrl. Found: {reader.fieldnames}"
-            )
+        reader = csv.reader(f)
+        header = next(reader, [])
+        # Resolve column positions once instead of building a dict per row with DictReader
+        idx = {name: i for i, name in enumerate(header)}
+        if _REQUIRED_COLUMNS - idx.keys():
+            raise ValueError(f"Input CSV must contain columns: id,name,imageUrl. Found: {header}")
+        id_i, name_i, url_i = idx["id"], idx["name"], idx["imageUrl"]
+        width = max(id_i, name_i, url_i) + 1
         for row in reader:
-            rows.append({"id": row.get("id", ""), "name": row.get("name", ""), "imageUrl": row.get("imageUrl", "")})
+            if not row:
+                continue
+            if len(row) < width:
+                row += [""] * (width - len(row))
+            rows.append({"id": row[id_i], "name": row[name_i], "imageUrl": row[url_i]})
     return rows
 
 
-def write_products_csv(path: str, rows: List[Dict[str, str]]) -> None:
+@contextmanager
+def open_products_writer(path: str) -> Iterator[Tuple[csv.DictWriter, TextIO]]:
+    """Open the output CSV with its header written, yielding (writer, file) for row-by-row writes."""
     with open(path, "w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=["id", "name", "imageUrl"])
         writer.writeheader()
-        for r in rows:
-            writer.writerow(r)
+        yield writer, f
 
 
 def setup_gemini(api_key: str):
@@ -83,7 +118,7 @@ def setup_gemini(api_key: str):
     # Imagen-series model available via Gemini Images
     # If your account does not have access to image generation, this call will fail
     # and we will fall back to placeholder URLs.
-    model = genai.GenerativeModel("imagen-3.0")
+    model = genai.GenerativeModel(MODEL_NAME)
     return model
 
 
@@ -95,8 +130,8 @@ def prompt_for(name: str) -> str:
     )
 
 
-def generate_image_data_url(model, prompt: str, size: str = "512x512") -> str:
-    """Return a data URL string for a generated PNG image.
+def generate_image_payload(model, prompt: str, size: str = "512x512") -> Union[bytes, str]:
+    """Return the generated PNG as the SDK hands it back: raw bytes, or a base64 string.
 
     If generation fails, raises an exception for the caller to handle.
     """
@@ -109,16 +144,191 @@ def generate_image_data_url(model, prompt: str, size: str = "512x512") -> str:
         img = response.images[0]
         # Some SDK versions return raw bytes as .data, others may return base64 already
         data_bytes = getattr(img, "data", None)
-        if isinstance(data_bytes, bytes):
-            b64 = base64.b64encode(data_bytes).decode("ascii")
-        elif isinstance(data_bytes, str):
-            # likely already base64
-            b64 = data_bytes
-        else:
+        if not isinstance(data_bytes, (bytes, str)):
             raise RuntimeError("Unexpected image payload shape")
-        return f"data:image/png;base64,{b64}"
+        return data_bytes
     except Exception as e:
-        raise RuntimeError(f"Gemini image generation failed: {e}")
+        raise RuntimeError(f"Gemini image generation failed: {e}") from e
+
+
+def generate_image_data_url(model, prompt: str, size: str = "512x512") -> str:
+    """Return a data URL string for a generated PNG image."""
+    data_bytes = generate_image_payload(model, prompt, size)
+    if isinstance(data_bytes, bytes):
+        # Encode straight after the prefix so the URL is decoded to str only once
+        return b"".join((_DATA_URL_PREFIX, binascii.b2a_base64(data_bytes, newline=False))).decode("ascii")
+    # likely already base64
+    return _DATA_URL_PREFIX.decode("ascii") + data_bytes
+
+
+def save_generated_image(model, prompt: str, size: str, path: Path) -> None:
+    """Generate a PNG image and write its raw bytes to `path`, skipping base64 entirely."""
+    data_bytes = generate_image_payload(model, prompt, size)
+    if isinstance(data_bytes, str):
+        data_bytes = binascii.a2b_base64(data_bytes)
+    path.write_bytes(data_bytes)
+
+
+def image_filename(pid: str, index: int) -> str:
+    """File name for a product's image; ids are sanitized and rows without one use their index."""
+    stem = _UNSAFE_FILENAME_CHARS.sub("_", pid.strip())
+    return f"{stem or f'row{index}'}.png"
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """True if a generation error was Gemini rejecting the call for quota (HTTP 429)."""
+    cause = exc.__cause__ or exc
+    return getattr(cause, "code", None) == 429 or type(cause).__name__ == "ResourceExhausted"
+
+
+async def verify_existing_urls(rows: List[Dict[str, str]], concurrency: int = 32, timeout: float = 5.0) -> int:
+    """HEAD every existing http(s) imageUrl and clear the ones that no longer resolve.
+
+    Cleared rows are then regenerated like rows that never had an image. Data URLs and local
+    paths are kept as they are. Returns how many rows were cleared.
+    """
+    import aiohttp  # type: ignore
+
+    sem = asyncio.Semaphore(concurrency)
+    to_check = [r for r in rows if r.get("imageUrl", "").startswith(("http://", "https://"))]
+
+    async def check(session: aiohttp.ClientSession, r: Dict[str, str]) -> bool:
+        async with sem:
+            try:
+                async with session.head(r["imageUrl"], allow_redirects=True) as res:
+                    # 405: the host does not allow HEAD, which still means the URL is there
+                    return res.status < 400 or res.status == 405
+            except Exception:
+                return False
+
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        results = await asyncio.gather(*(check(session, r) for r in to_check))
+
+    broken = 0
+    for r, ok in zip(to_check, results):
+        if not ok:
+            log.info("Existing image for %s is unreachable, will regenerate: %s", r.get("name"), r["imageUrl"])
+            r["imageUrl"] = ""
+            broken += 1
+    return broken
+
+
+async def generate_rows(
+    rows: List[Dict[str, str]],
+    model,
+    size: str,
+    concurrency: int,
+    rate: float,
+    writer: csv.DictWriter,
+    out: TextIO,
+    image_dir: Optional[Path] = None,
+    cache: Optional[ImageCache] = None,
+) -> None:
+    """Fill in imageUrl for every row and stream it to `writer`, with up to `concurrency` Gemini calls in flight.
+
+    The SDK is synchronous, so each call runs on a worker thread; the semaphore bounds how many
+    requests are outstanding at once and the token bucket paces them to `rate` per second.
+    Rows are written in input order as soon as they are ready, so generated data URLs are not
+    held in memory for the whole run and a crash keeps the rows written so far.
+
+    With `image_dir`, each image is saved there as a PNG and imageUrl holds its path instead of
+    a data URL. With `cache`, rows whose prompt was generated on an earlier run reuse that result.
+    """
+    loop = asyncio.get_running_loop()
+    sem = asyncio.Semaphore(concurrency)
+    bucket = AsyncTokenBucket(rate, capacity=concurrency)
+    total = len(rows)
+
+    # Data URLs and saved files are cached separately so each mode gets back what it expects
+    mode = "data" if image_dir is None else f"file:{image_dir.as_posix()}"
+
+    def cache_key(name: str) -> str:
+        return ImageCache.key(MODEL_NAME, size, mode, prompt_for(name))
+
+    async def worker(i: int, r: Dict[str, str], name: str) -> Dict[str, str]:
+        async with sem:
+            await bucket.acquire()
+            try:
+                if image_dir is None:
+                    url = await loop.run_in_executor(
+                        pool, generate_image_data_url, model, prompt_for(name), size
+                    )
+                else:
+                    path = image_dir / image_filename(r["id"], i)
+                    await loop.run_in_executor(
+                        pool, save_generated_image, model, prompt_for(name), size, path
+                    )
+                    url = path.as_posix()
+                status = "ok"
+                if cache is not None:
+                    cache.put(cache_key(name), url)
+            except Exception as e:
+                if is_rate_limited(e):
+                    bucket.penalize(RATE_LIMIT_BACKOFF)
+                url = PLACEHOLDER_URL
+                status = f"fail ({e}) -> placeholder"
+        log.info("[%d/%d] %s -> %s", i, total, name, status)
+        return {"id": r["id"], "name": r["name"], "imageUrl": url}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        # Finished rows and in-flight generation tasks, in input order
+        pending: Deque[Union[Dict[str, str], asyncio.Future]] = deque()
+        # Generation tasks queued ahead of the writer. Capped so one slow early row can't leave every
+        # later finished data URL waiting in memory
+        max_ahead = concurrency * 2
+        ahead = 0
+
+        async def write_next() -> None:
+            nonlocal ahead
+            item = pending.popleft()
+            if isinstance(item, asyncio.Future):
+                ahead -= 1
+                item = await item
+            writer.writerow(item)
+            out.flush()
+
+        try:
+            for i, r in enumerate(rows, start=1):
+                name = (r.get("name") or "").strip()
+
+                if not name:
+                    r["imageUrl"] = PLACEHOLDER_URL
+                    log.info("[%d/%d] %s -> skip", i, total, name)
+                    pending.append(r)
+                    continue
+
+                # Skip rows that already have an imageUrl
+                if r.get("imageUrl"):
+                    log.info("[%d/%d] %s -> existing", i, total, name)
+                    pending.append(r)
+                    continue
+
+                if cache is not None:
+                    cached = cache.get(cache_key(name))
+                    if cached and (image_dir is None or Path(cached).exists()):
+                        r["imageUrl"] = cached
+                        log.info("[%d/%d] %s -> cached", i, total, name)
+                        pending.append(r)
+                        continue
+
+                if model is None:
+                    r["imageUrl"] = PLACEHOLDER_URL
+                    log.info("[%d/%d] %s -> placeholder", i, total, name)
+                    pending.append(r)
+                    continue
+
+                # Write finished rows first if too many tasks are already ahead of the writer
+                while ahead >= max_ahead:
+                    await write_next()
+                pending.append(asyncio.ensure_future(worker(i, r, name)))
+                ahead += 1
+
+            while pending:
+                await write_next()
+        finally:
+            for item in pending:
+                if isinstance(item, asyncio.Future):
+                    item.cancel()
 
 
 def main() -> int:
@@ -126,18 +336,35 @@ def main() -> int:
     parser.add_argument("--in", dest="in_csv", required=True, help="Input CSV path (id,name,imageUrl)")
     parser.add_argument("--out", dest="out_csv", required=True, help="Output CSV path")
     parser.add_argument("--size", default="512x512", help="Image size, e.g., 512x512, 768x768")
+    parser.add_argument("--concurrency", type=int, default=8, help="Max Gemini requests in flight; raise for more parallelism")
+    parser.add_argument("--rate", type=float, default=2.0, help="Max Gemini requests per second (0 = unlimited)")
+    parser.add_argument(
+        "--image-dir",
+        default=None,
+        help="Save PNGs into this directory and store their paths instead of data URLs",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Do not read or update the {DEFAULT_CACHE_PATH} cache of earlier generations",
+    )
+    parser.add_argument(
+        "--verify-existing",
+        action="store_true",
+        help="HEAD existing image URLs first and regenerate only the ones that fail",
+    )
     args = parser.parse_args()
 
     try:
         api_key = load_api_key()
     except Exception as e:
-        print(e)
+        log.error("%s", e)
         return 1
 
     try:
         rows = read_products_csv(args.in_csv)
     except Exception as e:
-        print(f"Failed to read input CSV: {e}")
+        log.error("Failed to read input CSV: %s", e)
         return 1
 
     # Try to initialize Gemini. If it fails, we will skip generation and use placeholder.
@@ -145,54 +372,44 @@ def main() -> int:
     try:
         model = setup_gemini(api_key)
     except Exception as e:
-        print(f"[warn] Could not initialize Gemini image model: {e}")
-        print("[warn] Will use placeholder URLs for all rows.")
-
-    out_rows: List[Dict[str, str]] = []
-    for i, r in enumerate(rows, start=1):
-        name = (r.get("name") or "").strip()
-        pid = r.get("id") or ""
-        print(f"[{i}/{len(rows)}] {name} …", end=" ")
-
-        if not name:
-            r["imageUrl"] = PLACEHOLDER_URL
-            out_rows.append(r)
-            print("skip")
-            continue
-
-        # Skip rows that already have an imageUrl
-        if r.get("imageUrl"):
-            out_rows.append(r)
-            print("existing")
-            continue
-
-        if model is None:
-            r["imageUrl"] = PLACEHOLDER_URL
-            out_rows.append(r)
-            print("placeholder")
-            continue
+        log.warning("Could not initialize Gemini image model: %s. Will use placeholder URLs for all rows.", e)
+
+    if args.verify_existing:
+        try:
+            broken = asyncio.run(verify_existing_urls(rows))
+        except Exception as e:
+            log.error("Failed to verify existing image URLs: %s", e)
+            return 1
+        log.info("Verified existing image URLs, %d to regenerate", broken)
 
+    image_dir = None
+    if args.image_dir:
+        image_dir = Path(args.image_dir)
         try:
-            data_url = generate_image_data_url(model, prompt_for(name), size=args.size)
-            r["imageUrl"] = data_url
-            out_rows.append(r)
-            print("ok")
+            image_dir.mkdir(parents=True, exist_ok=True)
         except Exception as e:
-            r["imageUrl"] = PLACEHOLDER_URL
-            out_rows.append(r)
-            print(f"fail ({e}) -> placeholder")
+            log.error("Failed to create image directory: %s", e)
+            return 1
 
     try:
-        write_products_csv(args.out_csv, out_rows)
+        with open_products_writer(args.out_csv) as (writer, out), (
+            nullcontext() if args.no_cache else ImageCache(DEFAULT_CACHE_PATH)
+        ) as cache:
+            asyncio.run(
+                generate_rows(
+                    rows, model, args.size, max(1, args.concurrency), args.rate, writer, out, image_dir, cache
+                )
+            )
     except Exception as e:
-        print(f"Failed to write output CSV: {e}")
+        log.error("Failed to write output CSV: %s", e)
         return 1
 
-    print(f"\nDone. Wrote: {args.out_csv}")
+    log.info("Done. Wrote: %s", args.out_csv)
     return 0
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    with queued_logging():
+        sys.exit(main())
 
 
@@ -7,43 +7,69 @@ How it works
 - Writes results to generated_images.csv and generated_images.json in this folder
 
 Run (from repo root, server running):
-  py server/scripts/generate_images.py
+  py server/scripts/generate_images.py [--concurrency 4] [--rate 1.5] [--no-cache]
 
 Notes
 - This does not modify the database. Review the generated CSV/JSON first.
 - If DuckDuckGo blocks or rate limits, the script falls back to a deterministic
   placeholder from Picsum (seeded by product name).
+- Successful lookups are cached in image_cache.db, so re-runs only query new product names.
 """
 
 from __future__ import annotations
 
+import argparse
+import asyncio
 import csv
 import json
-import time
+import logging
+import re
 import sys
-from typing import Dict, List, Any
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+from urllib.parse import quote
 
-import requests
+import aiohttp
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # optional speedup; fall back to the stdlib encoder
+    orjson = None
+
+from image_cache import DEFAULT_CACHE_PATH, ImageCache
+from rate_limit import AsyncTokenBucket, RateLimited, retry_after_seconds
+from script_logging import queued_logging
+
+log = logging.getLogger(__name__)
 
 BACKEND_URL = "http://localhost:5000"
 PRODUCTS_API = f"{BACKEND_URL}/api/products"
+# Search token embedded in the DDG landing page as vqd='...' or vqd="..."
+_VQD_RE = re.compile(rb"vqd=['\"]([^'\"]+)['\"]")
+
+DDG_URL = "https://duckduckgo.com/"
+DDG_IMAGES_URL = "https://duckduckgo.com/i.js"
+DDG_HEADERS = {"User-Agent": "Mozilla/5.0"}
+DDG_TIMEOUT = aiohttp.ClientTimeout(total=20)
+
+QUEUE_SIZE = 32
 
 
-def fetch_products() -> List[Dict[str, Any]]:
+async def fetch_products_async(session: aiohttp.ClientSession) -> List[Dict[str, Any]]:
     try:
-        res = requests.get(PRODUCTS_API, timeout=20)
-        res.raise_for_status()
-        data = res.json()
+        async with session.get(PRODUCTS_API) as res:
+            res.raise_for_status()
+            data = await res.json()
         products = data.get("products") or []
         if not isinstance(products, list):
             raise RuntimeError("Unexpected products payload")
         return products
     except Exception as e:
-        print(f"Failed to fetch products from {PRODUCTS_API}: {e}")
+        log.error("Failed to fetch products from %s: %s", PRODUCTS_API, e)
         return []
 
 
-def duckduckgo_image(product_name: str) -> str | None:
+async def duckduckgo_image(session: aiohttp.ClientSession, product_name: str) -> str | None:
     """Return the first image URL from DuckDuckGo Images for a query.
 
     This uses the unofficial endpoint similar to the snippet the user shared.
@@ -51,87 +77,194 @@ def duckduckgo_image(product_name: str) -> str | None:
     """
     try:
         # Step 1: obtain the token
-        init = requests.post(
-            "https://duckduckgo.com/",
-            data={"q": product_name},
-            timeout=15,
-            headers={"User-Agent": "Mozilla/5.0"},
-        )
-        init.raise_for_status()
-        text = init.text
-        marker = "vqd='"
-        if marker not in text:
-            # Try alt marker that sometimes appears
-            marker = 'vqd="'
-        token = text.split(marker, 1)[1].split("'" if marker.endswith("'") else '"', 1)[0]
+        async with session.post(DDG_URL, data={"q": product_name}) as init:
+            if init.status == 429:
+                raise RateLimited(retry_after_seconds(init.headers.get("Retry-After")))
+            init.raise_for_status()
+            body = await init.read()
+        # Match the raw bytes so the whole HTML page is never decoded
+        m = _VQD_RE.search(body)
+        if not m:
+            raise RuntimeError("vqd token not found")
+        token = m.group(1).decode("ascii")
 
         # Step 2: image API call
-        res = requests.get(
-            "https://duckduckgo.com/i.js",
-            params={"q": product_name, "vqd": token, "o": "json"},
-            headers={"User-Agent": "Mozilla/5.0"},
-            timeout=20,
-        )
-        res.raise_for_status()
-        data = res.json()
+        async with session.get(
+            DDG_IMAGES_URL, params={"q": product_name, "vqd": token, "o": "json"}
+        ) as res:
+            if res.status == 429:
+                raise RateLimited(retry_after_seconds(res.headers.get("Retry-After")))
+            res.raise_for_status()
+            # i.js is served as JavaScript, so skip the content-type check
+            data = await res.json(content_type=None)
         results = data.get("results") or []
         if results:
             return results[0].get("image")
+    except RateLimited:
+        raise
     except Exception as e:
-        print(f"[warn] DDG fetch failed for '{product_name}': {e}")
+        log.warning("DDG fetch failed for '%s': %s", product_name, e)
     return None
 
 
-def picsum_fallback(product_name: str) -> str:
-    return f"https://picsum.photos/seed/{requests.utils.quote(product_name.lower())}/800/600"
+def picsum_fallback(slug: str) -> str:
+    """Deterministic placeholder seeded by a product's URL-quoted, lower-cased name."""
+    return f"https://picsum.photos/seed/{slug}/800/600"
 
 
-def generate_for_products(products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
-    for i, p in enumerate(products, start=1):
-        name = (p.get("name") or "").strip()
-        pid = p.get("id") or p.get("_id") or ""
-        if not name:
-            continue
-        print(f"[{i}/{len(products)}] {name} …", end=" ")
-        url = duckduckgo_image(name)
-        if not url:
-            url = picsum_fallback(name)
-            print("fallback")
-        else:
-            print("ok")
-        out.append({"id": pid, "name": name, "imageUrl": url})
+async def generate_for_products(
+    session: aiohttp.ClientSession,
+    products: List[Dict[str, Any]],
+    writer: csv.DictWriter,
+    out: TextIO,
+    concurrency: int = 4,
+    rate: float = 1.5,
+    cache: Optional[ImageCache] = None,
+) -> List[Dict[str, Any]]:
+    """Look up an image for every named product and stream the rows to `writer`.
 
-        # Small delay to be polite and avoid rate limits
-        time.sleep(0.6)
-    return out
+    Runs as a pipeline: a producer feeds products into a bounded queue, `concurrency` workers
+    look them up (paced to `rate` per second, bursts of up to 3, to stay under DDG's rate
+    limits) and a single writer task drains their results. Rows are written in product order as
+    soon as they are ready, so an interrupted run keeps its progress; they are also returned for
+    the JSON output. With `cache`, products found on an earlier run skip the lookup entirely.
+    """
+    bucket = AsyncTokenBucket(rate, capacity=3)
+    total = len(products)
+    # Items are (seq, ...) so the writer can restore product order; None ends a stream
+    q_in: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    q_out: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    rows: List[Dict[str, Any]] = []
+
+    async def produce() -> None:
+        seq = 0
+        for i, p in enumerate(products, start=1):
+            name = (p.get("name") or "").strip()
+            pid = p.get("id") or p.get("_id") or ""
+            if not name:
+                continue
+            cached = cache.get(ImageCache.key("ddg", name)) if cache is not None else None
+            if cached:
+                log.info("[%d/%d] %s -> cached", i, total, name)
+                await q_out.put((seq, {"id": pid, "name": name, "imageUrl": cached}))
+            else:
+                await q_in.put((seq, i, pid, name))
+            seq += 1
+        for _ in range(concurrency):
+            await q_in.put(None)
 
+    async def work() -> None:
+        while True:
+            item = await q_in.get()
+            if item is None:
+                await q_out.put(None)
+                return
+            seq, i, pid, name = item
+            await bucket.acquire()
+            try:
+                url = await duckduckgo_image(session, name)
+            except RateLimited as e:
+                log.warning("DDG rate limited on '%s', pausing %.1fs", name, e.retry_after)
+                bucket.penalize(e.retry_after)
+                url = None
+            if not url:
+                url = picsum_fallback(quote(name.lower(), safe=""))
+                log.info("[%d/%d] %s -> fallback", i, total, name)
+            else:
+                log.info("[%d/%d] %s -> ok", i, total, name)
+                if cache is not None:
+                    cache.put(ImageCache.key("ddg", name), url)
+            await q_out.put((seq, {"id": pid, "name": name, "imageUrl": url}))
 
-def write_outputs(rows: List[Dict[str, Any]], base: str = "generated_images") -> None:
-    csv_path = f"{base}.csv"
-    json_path = f"{base}.json"
-    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+    async def write() -> None:
+        # Every worker sends None once it is done; the producer's direct puts all come before those
+        finished = 0
+        next_seq = 0
+        ready: Dict[int, Dict[str, Any]] = {}
+        while finished < concurrency:
+            item = await q_out.get()
+            if item is None:
+                finished += 1
+                continue
+            seq, row = item
+            ready[seq] = row
+            while next_seq in ready:
+                row = ready.pop(next_seq)
+                writer.writerow(row)
+                rows.append(row)
+                next_seq += 1
+            out.flush()
+
+    tasks = [asyncio.ensure_future(produce()), asyncio.ensure_future(write())]
+    tasks += [asyncio.ensure_future(work()) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+    return rows
+
+
+@contextmanager
+def open_csv_writer(path: str) -> Iterator[Tuple[csv.DictWriter, TextIO]]:
+    """Open the output CSV with its header written, yielding (writer, file) for row-by-row writes."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
         w = csv.DictWriter(f, fieldnames=["id", "name", "imageUrl"])
         w.writeheader()
-        for r in rows:
-            w.writerow(r)
+        yield w, f
+
+
+def write_json(rows: List[Dict[str, Any]], json_path: str) -> None:
+    if orjson is not None:
+        # orjson encodes straight to UTF-8 bytes
+        with open(json_path, "wb") as f:
+            f.write(orjson.dumps(rows, option=orjson.OPT_INDENT_2))
+        return
     with open(json_path, "w", encoding="utf-8") as f:
         json.dump(rows, f, indent=2, ensure_ascii=False)
-    print(f"\nWrote {len(rows)} records to:\n  - {csv_path}\n  - {json_path}")
 
 
-def main() -> int:
-    products = fetch_products()
-    if not products:
-        print("No products to process. Make sure the backend is running on http://localhost:5000")
-        return 1
-    results = generate_for_products(products)
-    write_outputs(results)
-    print("\nReview the CSV/JSON. When ready, I can apply these to the database.")
+async def main_async(args: argparse.Namespace) -> int:
+    # One session for the whole run, so connections to the backend and DDG stay pooled and reused
+    connector = aiohttp.TCPConnector(limit=max(8, args.concurrency))
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=DDG_TIMEOUT, headers=DDG_HEADERS
+    ) as session:
+        products = await fetch_products_async(session)
+        if not products:
+            log.error("No products to process. Make sure the backend is running on %s", BACKEND_URL)
+            return 1
+        base = "generated_images"
+        csv_path = f"{base}.csv"
+        json_path = f"{base}.json"
+        with open_csv_writer(csv_path) as (writer, out), (
+            nullcontext() if args.no_cache else ImageCache(DEFAULT_CACHE_PATH)
+        ) as cache:
+            results = await generate_for_products(
+                session, products, writer, out, args.concurrency, args.rate, cache
+            )
+    write_json(results, json_path)
+    log.info("Wrote %d records to %s and %s", len(results), csv_path, json_path)
+    log.info("Review the CSV/JSON. When ready, I can apply these to the database.")
     return 0
 
 
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Suggest image URLs for all backend products.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Max DuckDuckGo lookups in flight")
+    parser.add_argument("--rate", type=float, default=1.5, help="Max DuckDuckGo lookups per second (0 = unlimited)")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Do not read or update the {DEFAULT_CACHE_PATH} cache of earlier lookups",
+    )
+    args = parser.parse_args()
+    args.concurrency = max(1, args.concurrency)
+    return asyncio.run(main_async(args))
+
+
 if __name__ == "__main__":
-    sys.exit(main())
+    with queued_logging():
+        sys.exit(main())
 
 
@@ -0,0 +1,49 @@
+"""
+On-disk cache of image lookups shared by the image generation scripts.
+
+Maps a hash of everything that determines an image (model, size, prompt, ...) to the imageUrl it
+produced, so re-running a script only calls the remote API for products it has not seen before.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import time
+from typing import Optional
+
+DEFAULT_CACHE_PATH = "image_cache.db"
+
+
+class ImageCache:
+    """SQLite-backed key -> imageUrl store. Use from a single thread (the event loop)."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS cache(key TEXT PRIMARY KEY, url TEXT, created REAL)")
+        self.db.commit()
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        row = self.db.execute("SELECT url FROM cache WHERE key=?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, url: str) -> None:
+        self.db.execute(
+            "INSERT OR REPLACE INTO cache(key, url, created) VALUES (?, ?, ?)", (key, url, time.time())
+        )
+        self.db.commit()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> "ImageCache":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
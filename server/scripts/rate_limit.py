@@ -0,0 +1,77 @@
+"""
+Request pacing shared by the image generation scripts.
+
+AsyncTokenBucket lets callers issue requests at a steady rate (with short bursts) instead of
+sleeping a fixed time between calls or hammering an API until it answers 429.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+class RateLimited(Exception):
+    """Raised by a request helper when the remote side answered 429 Too Many Requests."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"rate limited, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def retry_after_seconds(value: Optional[str], default: float = 5.0) -> float:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class AsyncTokenBucket:
+    """Token bucket that paces async callers to `rate_per_sec`, allowing bursts up to `capacity`.
+
+    Create it inside the running event loop. A rate of 0 or less disables pacing.
+    """
+
+    def __init__(self, rate_per_sec: float, capacity: float = 1.0):
+        self.rate_per_sec = rate_per_sec
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate_per_sec)
+        self.last_refill = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available, then take it."""
+        if self.rate_per_sec <= 0:
+            return
+        # Holding the lock while sleeping hands tokens out to waiters in arrival order
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate_per_sec)
+                self._refill()
+            self.tokens -= 1
+
+    def penalize(self, seconds: float) -> None:
+        """Drain the bucket so the next request waits at least `seconds`, e.g. after a 429."""
+        if self.rate_per_sec <= 0:
+            return
+        self._refill()
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate_per_sec
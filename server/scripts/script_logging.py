@@ -0,0 +1,34 @@
+"""
+Logging setup shared by the image generation scripts.
+
+Records go through a queue and are written to stderr by a single listener thread, so concurrent
+workers never contend on the stream and stdout stays free for piping.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import sys
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterator
+
+
+@contextmanager
+def queued_logging(level: int = logging.INFO) -> Iterator[None]:
+    """Route all logging through a queue to stderr for the duration of the block."""
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    listener = QueueListener(records, handler)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.handlers[:] = [QueueHandler(records)]
+    listener.start()
+    try:
+        yield
+    finally:
+        # Flushes everything still queued before returning
+        listener.stop()